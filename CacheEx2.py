@@ -1,6 +1,13 @@
 import time
+from pathlib import Path
 from cacheLib import *
 
+# fiboCache 記憶體快取的上限：由下而上計算時只需要最近的兩個值
+FIBO_CACHE_SIZE = 128
+
+# 結果的磁碟檔案：只保存主程式要求的結果，重新執行時不必重新計算
+CACHE_DB = Path(__file__).parent / 'sample' / 'fiboCache.db'
+
 
 def fibo(n):
     """
@@ -29,6 +36,7 @@ def fibo(n):
         return fibo(n - 1) + fibo(n - 2)
 
 
+@cached(maxsize=FIBO_CACHE_SIZE, bottom_up=1)
 def fiboCache(n):
     """
     計算費波那契數列的第n個元素（使用快取）
@@ -40,7 +48,10 @@ def fiboCache(n):
     int: 費波那契數列的第n個元素
     
     備註:
-    這個實作使用快取機制來優化性能
+    這個實作使用 cacheLib.cached 裝飾器，把結果存在記憶體的 LRU 快取；
+    bottom_up=1 讓未命中的 n 先由小到大填表，
+    所以 fiboCache(big_n) 也不會超過遞迴深度限制；
+    填表的中間結果只留在記憶體，不會寫到磁碟
     """
     # 驗證輸入是否為正整數
     if type(n) != int:
@@ -48,41 +59,17 @@ def fiboCache(n):
     elif n < 1:
         raise ValueError("輸入必須為正整數")
 
-    # 處理基本情況
+    # 基本情況：前兩個費波那契數都是1
     if n == 1 or n == 2:
-        # 將結果存入快取
-        my_cache.add(n, 1)
         return 1
-    else:
-        # 計算前兩個費波那契數
-        a1 = n - 1
-        a2 = n - 2
-        
-        # 檢查快取中是否已有a1的值
-        if not my_cache.has(a1):
-            # 如果沒有，遞迴計算並存入快取
-            my_cache.add(a1, fiboCache(a1))
-        else:
-            # 如果有，增加參考計數
-            my_cache.inc(a1)
-
-        # 檢查快取中是否已有a2的值
-        if not my_cache.has(a2):
-            my_cache.add(a2, fiboCache(a2))
-        else:
-            my_cache.inc(a2)
-
-        # 回傳兩個數的和
-        return my_cache.get(a1) + my_cache.get(a2)
+    # 前兩個數已經在快取中，遞迴只有一層
+    return fiboCache(n - 1) + fiboCache(n - 2)
 
 
 if __name__ == '__main__':
     # 設定最大計算範圍
     max_loop = 31
     
-    # 建立快取實例
-    my_cache = Cache()
-    
     # 測試不使用快取的版本
     print("=== 不使用快取的版本 ===")
     t1 = time.time()
@@ -104,3 +91,22 @@ if __name__ == '__main__':
     # 比較兩個版本的性能
     speedup = cacheless_time / cached_time
     print(f'性能比較: 不使用快取的版本比使用快取的版本慢 {speedup:.1f} 倍')
+    print(f'快取統計: {fiboCache.cache_info()}\n')
+
+    # 測試大數：由下而上填表，不會觸發 RecursionError；
+    # 兩層快取（記憶體 LRU 在前，磁碟在後）只包住最外層的呼叫，
+    # 填表的中間結果留在 fiboCache 的記憶體快取，磁碟只保存 fiboCache(big_n) 本身，
+    # 第二次執行時直接由磁碟載回
+    my_cache = TieredCache(DiskStore(CACHE_DB),
+                           memory=Cache(max_entries=FIBO_CACHE_SIZE, policy='lru'))
+    fiboPersisted = cached(cache=my_cache)(fiboCache)
+    big_n = 100_000
+    t5 = time.time()
+    result = fiboPersisted(big_n)
+    t6 = time.time()
+    print(f'fiboCache({big_n:,}) 有 {result.bit_length():,} 位元，花費時間: {t6 - t5:.6f} 秒')
+    print(f'快取統計: {fiboCache.cache_info()}，'
+          f'磁碟快取統計: {fiboPersisted.cache_info()}')
+
+    # 將尚未寫入的結果寫到磁碟，下次執行時直接載回
+    my_cache.close()
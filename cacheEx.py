@@ -2,11 +2,42 @@
 使用快取來優化 HTTP 請求的範例
 這個範例展示了如何使用快取來避免重複的 HTTP 請求，
 從而提高應用程式的性能。
+
+多個執行緒（或協程）同時未命中同一個 URL 時，
+只會送出一個 HTTP 請求，其他呼叫者共用同一個結果 (single-flight)。
+
+網頁內容存在兩層快取 (TieredCache)：記憶體中的分片快取在前，
+SQLite 磁碟檔案在後，重新執行時未過期的網頁可以直接由磁碟載回。
+
+AsyncHTTPCache 是 asyncio 版本的 HTTP 快取：記錄 ETag/Last-Modified，
+過期時以條件式請求重新驗證，伺服器回覆 304 時不必重新下載內容。
 """
 
+import asyncio
+import http.server
+import threading
+import time
+from email.utils import formatdate
+from pathlib import Path
+from urllib.parse import urlsplit
 import requests
 import random
-from cacheLib import Cache
+from cacheLib import (Cache, ShardedCache, SingleFlight, AsyncSingleFlight,
+                      DiskStore, TieredCache)
+
+# 快取的記憶體預算：超過時依 LFU 逐一淘汰網頁內容
+MAX_CACHE_BYTES = 16 * 1024 * 1024
+
+# 快取分片數量：讓多個執行緒可以同時存取快取
+CACHE_SHARDS = 4
+
+# 網頁內容的存活秒數，以及過期後仍可先回傳舊內容、
+# 同時在背景重新下載的寬限秒數
+PAGE_TTL = 60
+PAGE_STALE_TTL = 300
+
+# 網頁快取的磁碟檔案：記錄每個網頁的過期時間，重新執行時仍然有效
+PAGE_DB = Path(__file__).parent / 'sample' / 'pageCache.db'
 
 
 def get_url(url):
@@ -25,26 +56,15 @@ def get_url(url):
     """
     print("===>正在獲取 URL...")
 
-    # 檢查快取中是否已有該 URL 的內容
-    if my_cache.has(url):
+    # 檢查快取中是否已有該 URL 的內容，命中時同時增加存取次數
+    val_obj = page_cache().lookup(url)
+    if val_obj is not None:
         print(f"===>快取命中: {url}")
-        # 增加該 URL 的存取次數
-        my_cache.inc(url)
-        # 從快取獲取內容
-        val_obj = my_cache.get(url)
     else:
         print(f"===>快取未命中: {url}")
-        # 發送 HTTP 請求並處理可能的錯誤
+        # 同一個 URL 同時未命中時只送出一個 HTTP 請求
         try:
-            response = requests.get(url, timeout=2.50)
-            if response.status_code == requests.codes.ok:
-                # 將內容存入快取
-                my_cache.add(url, response.text)
-                # 從快取獲取內容
-                val_obj = my_cache.get(url)
-            else:
-                print(f"===>錯誤: HTTP 狀態碼 {response.status_code}")
-                val_obj = None
+            val_obj = in_flight.do(url, fetch_url, url)
         except requests.exceptions.RequestException as e:
             print(f"===>錯誤: 無法連接到伺服器 - {str(e)}")
             val_obj = None
@@ -52,6 +72,56 @@ def get_url(url):
     return val_obj
 
 
+async def async_get_url(url):
+    """
+    get_url 的 asyncio 版本
+
+    參數:
+    url (str): 要訪問的 URL
+
+    回傳:
+    str: URL 的內容，如果請求失敗則返回 None
+
+    備註:
+    同一個 URL 同時未命中的協程共用同一個下載工作，
+    HTTP 請求在背景執行緒中送出，不會阻塞事件迴圈
+    """
+    val_obj = page_cache().lookup(url)
+    if val_obj is not None:
+        print(f"===>快取命中: {url}")
+        return val_obj
+
+    print(f"===>快取未命中: {url}")
+    try:
+        return await async_in_flight.do(url, asyncio.to_thread, fetch_url, url)
+    except requests.exceptions.RequestException as e:
+        print(f"===>錯誤: 無法連接到伺服器 - {str(e)}")
+        return None
+
+
+def fetch_url(url):
+    """
+    發送 HTTP 請求，成功時將內容存入快取
+
+    參數:
+    url (str): 要訪問的 URL
+
+    回傳:
+    str: URL 的內容，HTTP 狀態碼不是 200 時返回 None
+
+    備註:
+    連線錯誤會引發 requests.exceptions.RequestException，
+    由 single-flight 傳給所有等待同一個 URL 的呼叫者
+    """
+    response = requests.get(url, timeout=2.50)
+    if response.status_code != requests.codes.ok:
+        print(f"===>錯誤: HTTP 狀態碼 {response.status_code}")
+        return None
+    # 將內容存入快取
+    page_cache().add(url, response.text)
+    return response.text
+
+
 def get_url_from_server(url):
     """
     從 HTTP 伺服器獲取指定 URL 的內容
@@ -72,10 +142,287 @@ def get_url_from_server(url):
     return None
 
 
+# 網頁快取在第一次使用時才建立，匯入模組時不會開啟磁碟檔案
+_page_cache = None
+_page_cache_lock = threading.Lock()
+
+
+def page_cache():
+    """
+    取得網頁快取，第一次呼叫時才建立
+
+    回傳:
+    TieredCache: 執行緒安全的兩層快取
+
+    備註:
+    記憶體層限制網頁內容佔用的記憶體，過期的網頁由 get_url_from_server
+    在背景重新下載；磁碟層 (PAGE_DB) 保存所有網頁，重新執行時依需要載回
+    """
+    global _page_cache
+    with _page_cache_lock:
+        if _page_cache is None:
+            _page_cache = TieredCache(
+                DiskStore(PAGE_DB),
+                memory=ShardedCache(n_shards=CACHE_SHARDS, max_bytes=MAX_CACHE_BYTES,
+                                    default_ttl=PAGE_TTL, stale_ttl=PAGE_STALE_TTL,
+                                    loader=get_url_from_server))
+        return _page_cache
+
+
+# 進行中的下載：執行緒與 asyncio 各一個
+in_flight = SingleFlight()
+async_in_flight = AsyncSingleFlight()
+
+
+class AsyncHTTPCache:
+    """
+    asyncio 版本的 HTTP 快取，支援條件式重新驗證
+
+    - 保存每個 URL 的內容與 ETag/Last-Modified
+    - 超過 ttl 秒後送出 If-None-Match/If-Modified-Since，
+      伺服器回覆 304 時直接沿用快取內容 (便宜的命中)
+    - 所有請求共用一個 requests.Session 連線池，
+      並以每個主機一個 Semaphore 限制同時下載的數量
+    - 同一個 URL 同時重新驗證時只送出一個請求
+    """
+
+    def __init__(self, cache=None, ttl=PAGE_TTL, max_per_host=4, timeout=2.50):
+        """
+        參數:
+        cache: 存放回應的快取，預設為 MAX_CACHE_BYTES 記憶體預算的 Cache
+        ttl (float): 回應被視為新鮮、不必重新驗證的秒數
+        max_per_host (int): 每個主機同時進行的請求上限
+        timeout (float): 每個請求的逾時秒數
+        """
+        self.cache = cache if cache is not None else Cache(max_bytes=MAX_CACHE_BYTES)
+        self.ttl = ttl
+        self.max_per_host = max_per_host
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.stats = {'hits': 0, 'not_modified': 0, 'downloads': 0, 'errors': 0}
+        self._host_limits = dict()      # 主機 -> asyncio.Semaphore
+        self._in_flight = AsyncSingleFlight()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """關閉共用的連線池"""
+        self.session.close()
+
+    async def get(self, url):
+        """
+        獲取指定 URL 的內容
+
+        參數:
+        url (str): 要訪問的 URL
+
+        回傳:
+        str: URL 的內容，如果請求失敗則返回 None
+        """
+        entry = self.cache.lookup(url)
+        if entry is not None and time.monotonic() - entry['checked'] < self.ttl:
+            self.stats['hits'] += 1
+            return entry['body']
+        return await self._in_flight.do(url, self._fetch, url, entry)
+
+    async def _fetch(self, url, entry):
+        """
+        下載或重新驗證 URL
+
+        參數:
+        url (str): 要訪問的 URL
+        entry (dict): 快取中的舊回應，沒有時為 None
+        """
+        headers = dict()
+        if entry is not None:
+            if entry['etag']:
+                headers['If-None-Match'] = entry['etag']
+            if entry['last_modified']:
+                headers['If-Modified-Since'] = entry['last_modified']
+
+        host = urlsplit(url).netloc
+        limit = self._host_limits.get(host)
+        if limit is None:
+            limit = self._host_limits[host] = asyncio.Semaphore(self.max_per_host)
+        try:
+            async with limit:
+                response = await asyncio.to_thread(
+                    self.session.get, url, headers=headers, timeout=self.timeout)
+        except requests.exceptions.RequestException as e:
+            print(f"===>錯誤: 無法連接到伺服器 - {str(e)}")
+            self.stats['errors'] += 1
+            return None
+
+        if response.status_code == 304 and entry is not None:
+            # 內容沒有變更：只更新驗證時間
+            self.stats['not_modified'] += 1
+            entry['checked'] = time.monotonic()
+            return entry['body']
+        if response.status_code != requests.codes.ok:
+            print(f"===>錯誤: HTTP 狀態碼 {response.status_code}")
+            self.stats['errors'] += 1
+            return None
+
+        self.stats['downloads'] += 1
+        self.cache.add(url, {
+            'body': response.text,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'checked': time.monotonic(),
+        })
+        return response.text
+
+
+class StandInHandler(http.server.BaseHTTPRequestHandler):
+    """
+    本機替身 HTTP 伺服器，記錄每個路徑收到的請求次數
+
+    每個請求會延遲一下，讓並行的未命中確實重疊；
+    回應帶有 ETag 與 Last-Modified，條件式請求符合時回覆 304
+    """
+    request_counts = dict()
+    not_modified_counts = dict()
+    active = 0
+    max_active = 0
+    delay = 0.3
+    last_modified = formatdate(usegmt=True)
+    _lock = threading.Lock()
+
+    def do_GET(self):
+        cls = StandInHandler
+        with cls._lock:
+            cls.request_counts[self.path] = cls.request_counts.get(self.path, 0) + 1
+            cls.active += 1
+            cls.max_active = max(cls.max_active, cls.active)
+        try:
+            time.sleep(self.delay)
+            body = f'替身伺服器的內容: {self.path}'.encode('utf-8')
+            etag = f'"{len(body)}-{abs(hash(self.path))}"'
+            if self.headers.get('If-None-Match') == etag:
+                with cls._lock:
+                    cls.not_modified_counts[self.path] = cls.not_modified_counts.get(self.path, 0) + 1
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('ETag', etag)
+            self.send_header('Last-Modified', cls.last_modified)
+            self.end_headers()
+            self.wfile.write(body)
+        finally:
+            with cls._lock:
+                cls.active -= 1
+
+    def log_message(self, format, *args):
+        pass    # 不要在終端機列印每個請求
+
+
+def start_stand_in_server():
+    """
+    在背景執行緒啟動本機替身 HTTP 伺服器
+
+    回傳:
+    tuple: (伺服器實例, 基底 URL)
+    """
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), StandInHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_address[1]}'
+
+
+def test_single_flight(n_clients=50):
+    """
+    確認 n_clients 個並行的未命中只送出一個上游請求
+
+    參數:
+    n_clients (int): 同時請求同一個 URL 的執行緒/協程數量
+    """
+    server, base_url = start_stand_in_server()
+    try:
+        # 執行緒版本
+        url = f'{base_url}/threads'
+        barrier = threading.Barrier(n_clients)
+        results = []
+
+        def client():
+            barrier.wait()
+            results.append(get_url(url))
+
+        threads = [threading.Thread(target=client) for _ in range(n_clients)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        count = StandInHandler.request_counts.get('/threads', 0)
+        print(f'{n_clients} 個執行緒，上游請求次數: {count}')
+        assert count == 1 and len(set(results)) == 1
+
+        # asyncio 版本
+        url = f'{base_url}/asyncio'
+
+        async def clients():
+            return await asyncio.gather(*(async_get_url(url) for _ in range(n_clients)))
+
+        results = asyncio.run(clients())
+        count = StandInHandler.request_counts.get('/asyncio', 0)
+        print(f'{n_clients} 個協程，上游請求次數: {count}')
+        assert count == 1 and len(set(results)) == 1
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_async_http_cache(n_pages=8, max_per_host=2):
+    """
+    以本機替身伺服器測試 AsyncHTTPCache
+
+    1. 第一次下載 n_pages 個網頁，同一主機同時最多 max_per_host 個請求
+    2. ttl=0 讓第二次存取全部重新驗證，伺服器應回覆 304
+    3. 內容必須與第一次相同
+
+    參數:
+    n_pages (int): 網頁數量
+    max_per_host (int): 每個主機同時進行的請求上限
+    """
+    server, base_url = start_stand_in_server()
+    StandInHandler.max_active = 0
+    urls = [f'{base_url}/page{i}' for i in range(n_pages)]
+
+    async def run():
+        async with AsyncHTTPCache(ttl=0, max_per_host=max_per_host) as http_cache:
+            first = await asyncio.gather(*(http_cache.get(url) for url in urls))
+            second = await asyncio.gather(*(http_cache.get(url) for url in urls))
+            return first, second, http_cache.stats
+
+    try:
+        first, second, stats = asyncio.run(run())
+        not_modified = sum(StandInHandler.not_modified_counts.get(f'/page{i}', 0)
+                           for i in range(n_pages))
+        print(f'下載 {stats["downloads"]} 次，304 重新驗證 {stats["not_modified"]} 次，'
+              f'伺服器同時處理最多 {StandInHandler.max_active} 個請求')
+        assert first == second and None not in first
+        assert stats['downloads'] == n_pages and stats['not_modified'] == n_pages
+        assert not_modified == n_pages and StandInHandler.max_active <= max_per_host
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
 # 主程式
 if __name__ == '__main__':
-    # 建立快取實例
-    my_cache = Cache()
+    # 測試請求合併
+    print('測試請求合併...')
+    test_single_flight()
+
+    # 測試條件式重新驗證
+    print('測試 AsyncHTTPCache 條件式重新驗證...')
+    test_async_http_cache()
 
     # 測試 URL 列表
     urls = (
@@ -101,7 +448,9 @@ if __name__ == '__main__':
 
     # 測試快取管理功能
     print(f'測試快取管理功能...')
+    my_cache = page_cache()
     print(f'{my_cache}\n')
+    print(f'快取統計: {my_cache.stats()}\n')
 
     # 保留一半大小的快取，保留使用頻率最高的項目
     print(f'保留一半大小的快取，保留使用頻率最高的項目，不重置參考計數')
@@ -113,3 +462,6 @@ if __name__ == '__main__':
     print(f'保留並重置使用頻率最高的 {nbr} 個項目')
     my_cache.purge(size=nbr)
     print(f'{my_cache}\n')
+
+    # 將尚未寫入的網頁寫到磁碟，下次執行時直接載回
+    my_cache.close()
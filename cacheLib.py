@@ -4,25 +4,641 @@
 1. 快取縮減時的百分比控制
 2. 快取大小的上限控制
 3. 保留最常使用的項目
+4. 可抽換的淘汰策略 (policy)，皆為 O(1)：
+   - 'lru': 最近最少使用
+   - 'lfu': 最不常使用，以頻率桶 (frequency buckets) 實作
+   - 'arc': Adaptive Replacement Cache
+   - '2q': 2Q (A1in / A1out / Am 三個佇列)
+   - 'tinylfu': W-TinyLFU (視窗 LRU + 分段 LRU + Count-Min 頻率草圖)
+5. 記憶體上限 (max_bytes)：以可抽換的 sizer 估算每個項目的大小，
+   超過預算時逐一淘汰
+6. 存活時間 (TTL)：過期項目在存取時才移除 (lazy expiry)，
+   並以最小堆積 (heap) 定期清除，成本只與過期的項目數有關；
+   stale-while-revalidate 模式會先回傳舊值，同時在背景重新載入一次
+7. 分片快取 (ShardedCache)：依鍵的雜湊值分散到 N 個各自上鎖的 Cache，
+   讓多執行緒伺服器在不同分片上的存取不會互相等待
+8. 請求合併 (single-flight)：同一個鍵同時未命中時只執行一次載入，
+   其他呼叫者等待並共用同一個結果或例外（執行緒與 asyncio 版本）
+9. 兩層快取 (TieredCache)：記憶體中的 Cache 在前，SQLite 磁碟儲存在後，
+   寫入以批次延後 (write-behind) 寫到磁碟，重新啟動後依需要載回記憶體；
+   磁碟上的項目記錄過期時間，讀取時檢查
+10. 記憶化裝飾器 (@cached)：有上限的快取、型別區分的鍵、命中統計，
+    以及整數遞迴式的由下而上填表，避免深層遞迴
+11. 統計與監控：命中/未命中/加入/淘汰/過期計數、get/add 延遲直方圖，
+    snapshot() 不走訪項目即可取得統計，StatsExporter 定期輸出到日誌或 JSON 檔
 """
 
+import asyncio
+import atexit
+import functools
+import heapq
+import itertools
+import json
+import logging
+import pickle
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+
+logger = logging.getLogger(__name__)
+
+
+def deep_getsizeof(obj):
+    """
+    估算物件及其包含的所有物件佔用的位元組數
+
+    參數:
+    obj: 要估算的物件
+
+    回傳:
+    int: 估算的位元組數
+
+    備註:
+    會走訪 dict, list, tuple, set, frozenset 以及物件的 __dict__，
+    共用的物件只計算一次；使用堆疊而不是遞迴，不受遞迴深度限制
+    """
+    seen = set()
+    total = 0
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        total += sys.getsizeof(item)
+        if isinstance(item, (str, bytes, bytearray, int, float)):
+            continue
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+        if hasattr(item, '__dict__'):
+            stack.append(vars(item))
+    return total
+
+
+# 未命中的記號，用來區分「沒有這個鍵」與「值為 None」
+_MISSING = object()
+
+# 快取的計數器名稱
+_COUNTERS = ('hits', 'misses', 'inserts', 'evictions', 'expirations')
+
+
+class LatencyHistogram:
+    """
+    以 2 的次方分桶的延遲直方圖（單位：奈秒）
+
+    第 i 個桶記錄 bit_length 為 i 的延遲，也就是 [2^(i-1), 2^i) 奈秒，
+    記錄一次只需要一次整數運算與一次串列加法。
+    """
+
+    def __init__(self):
+        self.buckets = [0] * 64
+        self.count = 0
+        self.max_ns = 0
+
+    def record(self, ns):
+        self.buckets[min(ns.bit_length(), 63)] += 1
+        self.count += 1
+        if ns > self.max_ns:
+            self.max_ns = ns
+
+    def merge(self, other):
+        """把另一個直方圖的資料加到這個直方圖"""
+        for i, n in enumerate(other.buckets):
+            self.buckets[i] += n
+        self.count += other.count
+        self.max_ns = max(self.max_ns, other.max_ns)
+
+    def percentile(self, p):
+        """
+        回傳第 p 百分位延遲所在桶的上限（奈秒）
+
+        參數:
+        p (float): 百分位數，介於 0 到 100
+        """
+        if self.count == 0:
+            return 0
+        target = self.count * p / 100
+        running = 0
+        for i, n in enumerate(self.buckets):
+            running += n
+            if running >= target:
+                return min(1 << i, self.max_ns)
+        return self.max_ns
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'p50_ns': self.percentile(50),
+            'p99_ns': self.percentile(99),
+            'max_ns': self.max_ns,
+        }
+
+
+class _FreqNode:
+    """
+    LFU 頻率桶節點
+
+    同一個存取次數的鍵放在同一個桶中，桶內以 OrderedDict
+    維持加入順序，所以同頻率時先淘汰最舊的鍵。
+    所有的桶以雙向環狀串列依頻率由小到大串接。
+    """
+    __slots__ = ('freq', 'keys', 'prev', 'next')
+
+    def __init__(self, freq):
+        self.freq = freq
+        self.keys = OrderedDict()
+        self.prev = self
+        self.next = self
+
+
+class _LFUPolicy:
+    """
+    O(1) LFU 淘汰策略
+
+    參考 Shah, Mitra & Matani 的 O(1) LFU 設計：
+    - 鍵對應到所在的頻率桶
+    - 命中時將鍵移到下一個頻率桶（必要時新建）
+    - 淘汰時取最小頻率桶中最舊的鍵
+    """
+
+    needs_capacity = False
+
+    def __init__(self, capacity=None):
+        self.capacity = capacity
+        self._head = _FreqNode(0)   # 哨兵節點
+        self._node_of = dict()
+
+    def __len__(self):
+        return len(self._node_of)
+
+    def _insert_after(self, node, freq):
+        """在 node 之後插入一個新的頻率桶"""
+        new_node = _FreqNode(freq)
+        new_node.prev = node
+        new_node.next = node.next
+        node.next.prev = new_node
+        node.next = new_node
+        return new_node
+
+    def _unlink_if_empty(self, node):
+        """移除已經沒有任何鍵的頻率桶"""
+        if not node.keys:
+            node.prev.next = node.next
+            node.next.prev = node.prev
+
+    def insert(self, key):
+        """加入新鍵，頻率為 1"""
+        first = self._head.next
+        if first is self._head or first.freq != 1:
+            first = self._insert_after(self._head, 1)
+        first.keys[key] = None
+        self._node_of[key] = first
+
+    def touch(self, key):
+        """命中：將鍵移到頻率加一的桶"""
+        node = self._node_of[key]
+        target = node.next
+        if target is self._head or target.freq != node.freq + 1:
+            target = self._insert_after(node, node.freq + 1)
+        del node.keys[key]
+        target.keys[key] = None
+        self._node_of[key] = target
+        self._unlink_if_empty(node)
+
+    def remove(self, key):
+        """移除指定的鍵"""
+        node = self._node_of.pop(key)
+        del node.keys[key]
+        self._unlink_if_empty(node)
+
+    def evict(self):
+        """淘汰最小頻率桶中最舊的鍵，並回傳該鍵"""
+        node = self._head.next
+        key, _ = node.keys.popitem(last=False)
+        del self._node_of[key]
+        self._unlink_if_empty(node)
+        return key
+
+
+class _LRUPolicy:
+    """
+    O(1) LRU 淘汰策略
+
+    以 OrderedDict 維持存取順序，最舊的鍵在最前面。
+    """
+    needs_capacity = False
+
+    def __init__(self, capacity=None):
+        self.capacity = capacity
+        self._order = OrderedDict()
+
+    def __len__(self):
+        return len(self._order)
+
+    def insert(self, key):
+        self._order[key] = None
+
+    def touch(self, key):
+        self._order.move_to_end(key)
+
+    def remove(self, key):
+        del self._order[key]
+
+    def evict(self):
+        key, _ = self._order.popitem(last=False)
+        return key
+
+
+class _ARCPolicy:
+    """
+    ARC (Adaptive Replacement Cache) 淘汰策略
+
+    參考 Megiddo & Modha (2003)：
+    - T1: 只被存取過一次的項目 (LRU)
+    - T2: 被存取過兩次以上的項目 (LRU)
+    - B1, B2: T1, T2 最近被淘汰的鍵 (只記錄鍵，不存值)
+    - p: T1 的目標大小，依 B1/B2 的命中自動調整
+
+    掃描 (scan) 只會流過 T1，不會沖掉 T2 中的熱門項目。
+    """
+    needs_capacity = True
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.p = 0
+        self._t1 = OrderedDict()
+        self._t2 = OrderedDict()
+        self._b1 = OrderedDict()
+        self._b2 = OrderedDict()
+        self._incoming = None   # 剛加入、尚未完成淘汰的鍵
+        self._from_b2 = False
+
+    def __len__(self):
+        return len(self._t1) + len(self._t2)
+
+    def insert(self, key):
+        self._from_b2 = False
+        if key in self._b1:
+            # 最近才從 T1 淘汰：加大 T1 的目標大小
+            delta = max(len(self._b2) / len(self._b1), 1)
+            self.p = min(self.capacity, self.p + delta)
+            del self._b1[key]
+            self._t2[key] = None
+        elif key in self._b2:
+            # 最近才從 T2 淘汰：縮小 T1 的目標大小
+            delta = max(len(self._b1) / len(self._b2), 1)
+            self.p = max(0, self.p - delta)
+            del self._b2[key]
+            self._t2[key] = None
+            self._from_b2 = True
+        else:
+            self._t1[key] = None
+        self._incoming = key
+
+    def touch(self, key):
+        if key in self._t1:
+            del self._t1[key]
+            self._t2[key] = None
+        else:
+            self._t2.move_to_end(key)
+
+    def remove(self, key):
+        if key in self._t1:
+            del self._t1[key]
+        else:
+            del self._t2[key]
+
+    def evict(self):
+        # 依 ARC 的 REPLACE 規則選擇從 T1 或 T2 淘汰，
+        # 計算 T1 大小時不含剛加入的鍵，以免淘汰它自己
+        incoming, self._incoming = self._incoming, None
+        len_t1 = len(self._t1) - (incoming in self._t1)
+        len_t2 = len(self._t2) - (incoming in self._t2)
+        if len_t1 > 0 and (len_t2 == 0 or len_t1 > self.p or
+                           (self._from_b2 and len_t1 == self.p)):
+            key, _ = self._t1.popitem(last=False)
+            self._b1[key] = None
+        elif len_t2 > 0:
+            key, _ = self._t2.popitem(last=False)
+            self._b2[key] = None
+        else:
+            # 只剩剛加入的鍵 (例如 purge(0))
+            key, _ = (self._t1 or self._t2).popitem(last=False)
+            return key
+
+        # 限制幽靈清單：|T1| + |B1| <= c，全部 <= 2c
+        while self._b1 and len(self._t1) + len(self._b1) > self.capacity:
+            self._b1.popitem(last=False)
+        while self._b2 and len(self) + len(self._b1) + len(self._b2) > 2 * self.capacity:
+            self._b2.popitem(last=False)
+        return key
+
+
+class _TwoQPolicy:
+    """
+    2Q 淘汰策略
+
+    參考 Johnson & Shasha (1994) 的完整版 2Q：
+    - A1in: 第一次出現的鍵 (FIFO，約佔容量 1/4)
+    - A1out: 從 A1in 淘汰的鍵 (只記錄鍵，約為容量 1/2)
+    - Am: 在 A1out 中再次出現的熱門鍵 (LRU)
+
+    只出現一次的掃描流量停留在 A1in，不會擠掉 Am。
+    """
+    needs_capacity = True
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.k_in = max(1, capacity // 4)
+        self.k_out = max(1, capacity // 2)
+        self._a1in = OrderedDict()
+        self._a1out = OrderedDict()
+        self._am = OrderedDict()
+        self._incoming = None
+
+    def __len__(self):
+        return len(self._a1in) + len(self._am)
+
+    def insert(self, key):
+        if key in self._a1out:
+            del self._a1out[key]
+            self._am[key] = None
+        else:
+            self._a1in[key] = None
+        self._incoming = key
+
+    def touch(self, key):
+        # A1in 中的命中視為相關存取，不改變順序
+        if key in self._am:
+            self._am.move_to_end(key)
+
+    def remove(self, key):
+        if key in self._a1in:
+            del self._a1in[key]
+        else:
+            del self._am[key]
+
+    def evict(self):
+        incoming, self._incoming = self._incoming, None
+        am_has_victim = len(self._am) - (incoming in self._am) > 0
+        if self._a1in and (len(self._a1in) > self.k_in or not am_has_victim):
+            key, _ = self._a1in.popitem(last=False)
+            self._a1out[key] = None
+            if len(self._a1out) > self.k_out:
+                self._a1out.popitem(last=False)
+        else:
+            key, _ = self._am.popitem(last=False)
+        return key
+
+
+class _CountMinSketch:
+    """
+    4 位元計數的 Count-Min 頻率草圖 (TinyLFU 使用)
+
+    累計加入次數達到樣本大小時，所有計數減半 (aging)，
+    讓過去的熱門項目逐漸降溫。
+    """
+    _SEEDS = (0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F,
+              0x165667B19E3779F9, 0x27D4EB2F165667C5)
+
+    def __init__(self, capacity):
+        width = 16
+        while width < capacity:
+            width *= 2
+        self._shift = 64 - (width.bit_length() - 1)
+        self._rows = [bytearray(width) for _ in self._SEEDS]
+        self._sample_size = 10 * max(capacity, 1)
+        self._additions = 0
+
+    def _indexes(self, key):
+        h = hash(key)
+        shift = self._shift
+        return [((h ^ seed) * 0x9E3779B97F4A7C15 & 0xFFFFFFFFFFFFFFFF) >> shift
+                for seed in self._SEEDS]
+
+    def increment(self, key):
+        for row, i in zip(self._rows, self._indexes(key)):
+            if row[i] < 15:
+                row[i] += 1
+        self._additions += 1
+        if self._additions >= self._sample_size:
+            self._reset()
+
+    def frequency(self, key):
+        return min(row[i] for row, i in zip(self._rows, self._indexes(key)))
+
+    def _reset(self):
+        self._additions //= 2
+        for row in self._rows:
+            row[:] = bytes(c >> 1 for c in row)
+
+
+class _TinyLFUPolicy:
+    """
+    W-TinyLFU 淘汰策略
+
+    參考 Einziger, Friedman & Manes (2017)：
+    - 視窗 (window) LRU 約佔容量 1%，吸收新進的突發流量
+    - 主區為分段 LRU：試用區 (probation) 20%、保護區 (protected) 80%
+    - 視窗溢出的候選者只有在頻率草圖上比主區的受害者更常出現時，
+      才會被允許進入主區
+    """
+    needs_capacity = True
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.window_cap = max(1, capacity // 100)
+        self.main_cap = max(1, capacity - self.window_cap)
+        self.protected_cap = max(1, self.main_cap * 8 // 10)
+        self._window = OrderedDict()
+        self._probation = OrderedDict()
+        self._protected = OrderedDict()
+        self._sketch = _CountMinSketch(capacity)
+
+    def __len__(self):
+        return len(self._window) + len(self._probation) + len(self._protected)
+
+    def insert(self, key):
+        self._sketch.increment(key)
+        self._window[key] = None
+
+    def touch(self, key):
+        self._sketch.increment(key)
+        if key in self._window:
+            self._window.move_to_end(key)
+        elif key in self._probation:
+            # 試用區命中：升級到保護區，保護區滿時降級最舊的項目
+            del self._probation[key]
+            self._protected[key] = None
+            if len(self._protected) > self.protected_cap:
+                demoted, _ = self._protected.popitem(last=False)
+                self._probation[demoted] = None
+        else:
+            self._protected.move_to_end(key)
+
+    def remove(self, key):
+        for segment in (self._window, self._probation, self._protected):
+            if key in segment:
+                del segment[key]
+                return
+
+    def _main_victim(self):
+        """主區的受害者：試用區最舊的項目，其次是保護區"""
+        return self._probation or self._protected
+
+    def evict(self):
+        while len(self._window) > self.window_cap:
+            candidate, _ = self._window.popitem(last=False)
+            segment = self._main_victim()
+            if len(self._probation) + len(self._protected) < self.main_cap or not segment:
+                # 主區還有空位，直接進入試用區
+                self._probation[candidate] = None
+                continue
+            victim = next(iter(segment))
+            if self._sketch.frequency(candidate) > self._sketch.frequency(victim):
+                del segment[victim]
+                self._probation[candidate] = None
+                return victim
+            return candidate
+
+        segment = self._main_victim() or self._window
+        key, _ = segment.popitem(last=False)
+        return key
+
+
+# 可用的淘汰策略
+_POLICIES = {
+    'lru': _LRUPolicy,
+    'lfu': _LFUPolicy,
+    'arc': _ARCPolicy,
+    '2q': _TwoQPolicy,
+    'tinylfu': _TinyLFUPolicy,
+}
+
+
 class Cache:
     """
     快取類別
     
     屬性:
     cache (dict): 儲存快取資料的字典
+    max_entries (int): 項目數量的硬上限，None 表示不限制
+    max_bytes (int): 記憶體預算（位元組），None 表示不限制
+    bytes (int): 目前所有項目估算的位元組數
+    default_ttl (float): 預設存活秒數，None 表示永不過期
+    stale_ttl (float): 過期後仍可回傳舊值並背景重新載入的秒數
     """
     
-    def __init__(self):
+    def __init__(self, max_entries=None, policy=None, max_bytes=None, sizer=None,
+                 default_ttl=None, stale_ttl=None, loader=None, sweep_interval=1.0,
+                 timing=False):
         """
         初始化快取實例
         
-        每個快取項目的值是一個包含兩個元素的列表：
+        每個快取項目的值是一個包含五個元素的列表：
         1. value object (任何使用者定義的物件)
         2. reference count (整數): 用於追蹤該項目的存取次數
+        3. size (整數): sizer 估算的位元組數，未追蹤大小時為 0
+        4. expires (float): 過期時間 (time.monotonic)，None 表示永不過期
+        5. ttl (float): add() 指定的存活秒數，None 表示使用 default_ttl；
+           背景重新載入寫回時沿用
+
+        參數:
+        max_entries (int): 項目數量的硬上限，add() 超過時自動淘汰
+        policy (str): 淘汰策略名稱：'lru', 'lfu', 'arc', '2q', 'tinylfu'；
+            None 表示使用原本排序式的 purge/shrink。
+            設定 max_entries 或 max_bytes 而未指定策略時預設為 'lfu'
+        max_bytes (int): 記憶體預算，add() 超過時逐一淘汰直到回到預算內
+        sizer (callable): 估算值大小的函數，預設為 deep_getsizeof；
+            設定 max_bytes 或 sizer 時才會追蹤大小
+        default_ttl (float): add() 未指定 ttl 時使用的存活秒數
+        stale_ttl (float): stale-while-revalidate 的寬限秒數，
+            過期後在寬限期內 get() 回傳舊值並觸發一次背景重新載入
+        loader (callable): 背景重新載入使用的函數 loader(key)，
+            回傳 None 或引發例外時保留舊值
+        sweep_interval (float): add() 時自動呼叫 sweep() 的最短間隔秒數
+        timing (bool): 是否記錄 get/add 的延遲直方圖
+
+        備註:
+        如果 max_entries/max_bytes 不是正整數或策略名稱不存在，會引發 ValueError；
+        'arc', '2q', 'tinylfu' 需要容量才能運作，必須設定 max_entries；
+        設定 stale_ttl 時必須提供 loader
         """
+        if max_entries is not None and (
+                type(max_entries) != int or max_entries < 1):
+            raise ValueError("max_entries 必須為正整數")
+        if max_bytes is not None and (
+                type(max_bytes) != int or max_bytes < 1):
+            raise ValueError("max_bytes 必須為正整數")
+        if (max_entries is not None or max_bytes is not None) and policy is None:
+            policy = 'lfu'
+        if policy is not None and policy not in _POLICIES:
+            raise ValueError(f"未知的淘汰策略: {policy}")
+        if policy is not None and _POLICIES[policy].needs_capacity and max_entries is None:
+            raise ValueError(f"淘汰策略 {policy} 必須設定 max_entries")
+        if stale_ttl is not None and loader is None:
+            raise ValueError("stale_ttl 必須搭配 loader 使用")
+
         self.cache = dict()
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.policy = policy
+        self._policy = None if policy is None else _POLICIES[policy](max_entries)
+        if sizer is None and max_bytes is not None:
+            sizer = deep_getsizeof
+        self._sizer = sizer
+
+        self.default_ttl = default_ttl
+        self.stale_ttl = stale_ttl
+        self.sweep_interval = sweep_interval
+        self._grace = stale_ttl or 0
+        self._loader = loader
+        self._expiry_heap = []          # (移除時間, 序號, 鍵)
+        self._expiry_seq = itertools.count()
+        self._last_sweep = time.monotonic()
+        self._refreshing = set()        # 背景重新載入中的鍵
+        self._refreshed = dict()        # 背景重新載入完成、尚未寫回的值
+
+        # 統計計數器：每次操作只做一次整數加法
+        self.hits = 0
+        self.misses = 0
+        self.inserts = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.latency = None
+        if timing:
+            # 以計時版本覆蓋 get/add，不計時的時候沒有額外成本
+            self.latency = {'get': LatencyHistogram(), 'add': LatencyHistogram()}
+            self.get = self._timed(self.get, self.latency['get'])
+            self.add = self._timed(self.add, self.latency['add'])
+
+    @staticmethod
+    def _timed(method, histogram):
+        """
+        包裝方法，將每次呼叫的延遲記錄到直方圖
+        """
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter_ns()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                histogram.record(time.perf_counter_ns() - start)
+        return wrapper
+
+    def __len__(self):
+        """
+        回傳快取中的項目數量
+        """
+        return len(self.cache)
 
     def __repr__(self):
         """
@@ -31,7 +647,10 @@ class Cache:
         回傳:
         str: 快取內容的字串表示
         """
-        str_dump = f'快取內容 ({len(self.cache)}) 項目...\n'
+        str_dump = f'快取內容 ({len(self.cache)}) 項目'
+        if self._sizer is not None:
+            str_dump += f', {self.bytes:,} 位元組'
+        str_dump += '...\n'
         count = 1
         for key, value in self.cache.items():
             str_dump += f'{count}: 鍵: {key}\n'
@@ -50,18 +669,201 @@ class Cache:
         
         回傳:
         bool: 如果鍵存在則回傳 True，否則回傳 False
+
+        備註:
+        已超過寬限期的過期項目會在這裡移除並回傳 False；
+        只檢查是否存在，不計入命中/未命中統計
         """
-        return key in self.cache
+        if self._refreshed:
+            self._apply_refreshed()
+        entry = self.cache.get(key)
+        if entry is None:
+            return False
+        if entry[3] is not None and time.monotonic() >= entry[3] + self._grace:
+            self._remove(key)
+            return False
+        return True
 
-    def add(self, key, value):
+    def add(self, key, value, ttl=None):
         """
         將鍵值對加入快取
         
         參數:
         key: 要加入的鍵
         value: 要加入的值
+        ttl (float): 存活秒數，None 表示使用 default_ttl
+
+        備註:
+        如果設定了 max_entries 或 max_bytes，超過上限時會依淘汰策略
+        逐一移除項目；大於整個 max_bytes 預算的值不會被快取，
+        也不會淘汰其他項目（只移除同一個鍵的舊值）
+        """
+        if self._refreshed:
+            self._apply_refreshed()
+        size = 0 if self._sizer is None else self._sizer(value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            old = self.cache.pop(key, None)
+            if old is not None:
+                self.bytes -= old[2]
+                if self._policy is not None:
+                    self._policy.remove(key)
+            return
+        self.inserts += 1
+        old = self.cache.get(key)
+        if old is not None:
+            self.bytes -= old[2]
+        self.bytes += size
+        expires = None if ttl is None and self.default_ttl is None else self._expires(key, ttl)
+        entry = [value, 1, size, expires, ttl]  # 初始化存取次數為 1
+
+        if self._policy is None:
+            self.cache[key] = entry
+        else:
+            if old is not None:
+                # 重新加入視為新項目，存取次數從 1 開始
+                self._policy.remove(key)
+            self.cache[key] = entry
+            self._policy.insert(key)
+            self._enforce_limits()
+
+        if (self._expiry_heap and
+                time.monotonic() - self._last_sweep >= self.sweep_interval):
+            self.sweep()
+
+    def _enforce_limits(self):
+        """
+        淘汰項目直到符合 max_entries 與 max_bytes
+        """
+        if self.max_entries is not None:
+            while len(self.cache) > self.max_entries:
+                self._evict()
+        if self.max_bytes is not None:
+            while self.bytes > self.max_bytes and self.cache:
+                self._evict()
+
+    def _evict(self):
+        """
+        依淘汰策略移除一個項目
+        """
+        entry = self.cache.pop(self._policy.evict())
+        self.bytes -= entry[2]
+        self.evictions += 1
+
+    def _remove(self, key):
+        """
+        移除已過期的項目
+        """
+        entry = self.cache.pop(key)
+        self.bytes -= entry[2]
+        self.expirations += 1
+        if self._policy is not None:
+            self._policy.remove(key)
+
+    def _expires(self, key, ttl):
+        """
+        計算過期時間，並把移除時間排入最小堆積
+
+        回傳:
+        float: 過期時間，沒有 TTL 時回傳 None
+        """
+        if ttl is None:
+            ttl = self.default_ttl
+        if ttl is None:
+            return None
+        expires = time.monotonic() + ttl
+        heapq.heappush(self._expiry_heap,
+                       (expires + self._grace, next(self._expiry_seq), key))
+        return expires
+
+    def sweep(self):
+        """
+        移除所有已超過寬限期的過期項目
+
+        回傳:
+        int: 移除的項目數量
+
+        備註:
+        只從最小堆積彈出已到期的紀錄，成本與過期的紀錄數成正比，
+        不會掃描整個快取；鍵被重新加入後留下的舊紀錄在這裡直接略過
+        """
+        now = time.monotonic()
+        removed = 0
+        while self._expiry_heap and self._expiry_heap[0][0] <= now:
+            _, _, key = heapq.heappop(self._expiry_heap)
+            entry = self.cache.get(key)
+            if entry is not None and entry[3] is not None and now >= entry[3] + self._grace:
+                self._remove(key)
+                removed += 1
+        self._last_sweep = now
+        return removed
+
+    def _refresh(self, key):
+        """
+        背景執行緒：重新載入指定的鍵
+
+        結果先放在 _refreshed，由擁有快取的執行緒在下一次呼叫時寫回，
+        背景執行緒本身不修改快取內容
+        """
+        try:
+            value = self._loader(key)
+            if value is not None:
+                self._refreshed[key] = value
+        except Exception:
+            pass    # 載入失敗時保留舊值，直到超過寬限期
+        finally:
+            self._refreshing.discard(key)
+
+    def _apply_refreshed(self):
+        """
+        將背景重新載入完成的值寫回快取，保留原本的存取次數與存活秒數
+        """
+        while self._refreshed:
+            key, value = self._refreshed.popitem()
+            entry = self.cache.get(key)
+            if entry is None:
+                continue    # 重新載入期間已被淘汰
+            size = 0 if self._sizer is None else self._sizer(value)
+            self.bytes += size - entry[2]
+            entry[0] = value
+            entry[2] = size
+            entry[3] = self._expires(key, entry[4])
+            if self._policy is not None:
+                self._enforce_limits()
+
+    def stats(self):
+        """
+        回傳快取的目前狀態
+
+        回傳:
+        dict: 包含項目數量、位元組數與上限設定的字典
+        """
+        return {
+            'entries': len(self.cache),
+            'bytes': self.bytes,
+            'max_entries': self.max_entries,
+            'max_bytes': self.max_bytes,
+            'policy': self.policy,
+        }
+
+    def snapshot(self):
         """
-        self.cache[key] = [value, 1]  # 初始化存取次數為 1
+        回傳統計計數器的快照
+
+        回傳:
+        dict: stats() 的內容加上命中、未命中、加入、淘汰、過期次數、
+            命中率，以及 timing=True 時的 get/add 延遲摘要
+
+        備註:
+        只讀取計數器，不會走訪快取項目，可以頻繁呼叫
+        """
+        snap = self.stats()
+        for name in _COUNTERS:
+            snap[name] = getattr(self, name)
+        lookups = self.hits + self.misses
+        snap['hit_ratio'] = self.hits / lookups if lookups else 0.0
+        if self.latency is not None:
+            snap['latency'] = {op: h.to_dict() for op, h in self.latency.items()}
+        return snap
 
     def inc(self, key):
         """
@@ -69,7 +871,15 @@ class Cache:
         
         參數:
         key: 要增加存取次數的鍵
+
+        備註:
+        只更新存取次數與淘汰策略，命中統計由 get()/lookup() 計算
         """
+        if self._policy is not None:
+            self.cache[key][1] += 1
+            self._policy.touch(key)
+            return
+
         val_list = self.cache.pop(key)
         val_list[1] += 1  # 增加存取次數
         self.cache[key] = val_list
@@ -85,9 +895,51 @@ class Cache:
         any: 與鍵相關聯的值
         
         備註:
-        如果鍵不存在，會引發 KeyError
+        如果鍵不存在或已超過寬限期，會引發 KeyError；
+        已過期但仍在寬限期內時回傳舊值，並觸發一次背景重新載入。
+        每次呼叫計為一次命中或一次未命中
+        """
+        if self._refreshed:
+            self._apply_refreshed()
+        entry = self.cache.get(key)
+        if entry is None:
+            self.misses += 1
+            raise KeyError(key)
+        if entry[3] is not None:
+            now = time.monotonic()
+            if now >= entry[3] + self._grace:
+                self._remove(key)
+                self.misses += 1
+                raise KeyError(key)
+            if now >= entry[3] and key not in self._refreshing:
+                self._refreshing.add(key)
+                threading.Thread(target=self._refresh, args=(key,), daemon=True).start()
+        self.hits += 1
+        return entry[0]
+
+    def lookup(self, key, default=None):
+        """
+        查詢指定的鍵：命中時增加存取次數並回傳值
+
+        參數:
+        key: 要查詢的鍵
+        default: 未命中時回傳的值
+
+        回傳:
+        any: 與鍵相關聯的值，未命中時回傳 default
+
+        備註:
+        相當於 has() + inc() + get()，在 ShardedCache 中會在同一個鎖內完成；
+        每次呼叫計為一次命中或一次未命中
         """
-        return self.cache[key][0]
+        if not self.has(key):
+            self.misses += 1
+            return default
+        self.inc(key)
+        try:
+            return self.get(key)
+        except KeyError:
+            return default
 
     def purge(self, size=100):
         """
@@ -97,12 +949,19 @@ class Cache:
         size (int): 要保留的項目數量
         
         備註:
-        這個方法會重設每個保留項目的存取次數
+        這個方法會重設每個保留項目的存取次數；
+        使用淘汰策略時只淘汰多出的項目，不重設存取次數，
+        成本與淘汰的項目數成正比
         """
         if len(self.cache) <= size:
             # 快取已經在限制範圍內
             return
 
+        if self._policy is not None:
+            while len(self.cache) > size:
+                self._evict()
+            return
+
         # 按存取次數排序（由高到低）
         sorted_list = sorted(self.cache.items(), key=lambda kv: (
             kv[1][1], kv[0]), reverse=True)
@@ -114,6 +973,8 @@ class Cache:
         for i in range(size):
             sorted_list[i][1][1] = 0  # 重設存取次數
             self.cache[sorted_list[i][0]] = sorted_list[i][1]
+        self.bytes = sum(entry[2] for entry in self.cache.values())
+        self.evictions += len(sorted_list) - size
 
     def shrink(self, percent=50):
         """
@@ -125,6 +986,12 @@ class Cache:
         備註:
         這個方法不會重設存取次數
         """
+        if self._policy is not None:
+            count_keep = len(self.cache) * percent // 100 + 1
+            while len(self.cache) > count_keep:
+                self._evict()
+            return
+
         # 按存取次數排序（由高到低）
         sorted_list = sorted(self.cache.items(), key=lambda kv: (
             kv[1][1], kv[0]), reverse=True)
@@ -138,6 +1005,763 @@ class Cache:
         # 保留最常用的項目
         for i in range(count_keep):
             self.cache[sorted_list[i][0]] = sorted_list[i][1]
+        self.bytes = sum(entry[2] for entry in self.cache.values())
+        self.evictions += len(sorted_list) - count_keep
+
+
+class ShardedCache:
+    """
+    執行緒安全的分片快取
+
+    依鍵的雜湊值把項目分散到 n_shards 個獨立的 Cache，
+    每個分片有自己的鎖，落在不同分片的存取不會互相競爭。
+    提供與 Cache 相同的 has/add/inc/get/purge/shrink 介面。
+
+    屬性:
+    shards (list): 各分片的 Cache 實例
+    """
+
+    def __init__(self, n_shards=16, max_entries=None, max_bytes=None, **kwargs):
+        """
+        初始化分片快取
+
+        參數:
+        n_shards (int): 分片數量
+        max_entries (int): 整體項目數量上限，平均分配到各分片
+        max_bytes (int): 整體記憶體預算，平均分配到各分片
+        **kwargs: 其他傳給每個分片 Cache 的參數（policy, default_ttl...）
+
+        備註:
+        如果 n_shards 不是正整數，會引發 ValueError
+        """
+        if type(n_shards) != int or n_shards < 1:
+            raise ValueError("n_shards 必須為正整數")
+        if max_entries is not None:
+            max_entries = -(-max_entries // n_shards)  # 無條件進位
+        if max_bytes is not None:
+            max_bytes = -(-max_bytes // n_shards)
+        self.shards = [Cache(max_entries=max_entries, max_bytes=max_bytes, **kwargs)
+                       for _ in range(n_shards)]
+        self._locks = [threading.Lock() for _ in range(n_shards)]
+
+    @property
+    def default_ttl(self):
+        """各分片共用的預設存活秒數"""
+        return self.shards[0].default_ttl
+
+    def _shard(self, key):
+        """
+        回傳鍵所在分片的 (Cache, 鎖)
+        """
+        i = hash(key) % len(self.shards)
+        return self.shards[i], self._locks[i]
+
+    def __len__(self):
+        return sum(len(shard) for shard in self.shards)
+
+    def __repr__(self):
+        sizes = ', '.join(str(len(shard)) for shard in self.shards)
+        return f'分片快取 ({len(self)}) 項目，{len(self.shards)} 個分片: [{sizes}]\n'
+
+    def has(self, key):
+        shard, lock = self._shard(key)
+        with lock:
+            return shard.has(key)
+
+    def add(self, key, value, ttl=None):
+        shard, lock = self._shard(key)
+        with lock:
+            shard.add(key, value, ttl)
+
+    def inc(self, key):
+        shard, lock = self._shard(key)
+        with lock:
+            shard.inc(key)
+
+    def get(self, key):
+        shard, lock = self._shard(key)
+        with lock:
+            return shard.get(key)
+
+    def lookup(self, key, default=None):
+        shard, lock = self._shard(key)
+        with lock:
+            return shard.lookup(key, default)
+
+    def purge(self, size=100):
+        """
+        逐一分片清除最不常用的項目
+
+        參數:
+        size (int): 整體要保留的項目數量，平均分配到各分片
+        """
+        per_shard = -(-size // len(self.shards))
+        for shard, lock in zip(self.shards, self._locks):
+            with lock:
+                shard.purge(per_shard)
+
+    def shrink(self, percent=50):
+        """
+        逐一分片縮減到指定的百分比
+
+        參數:
+        percent (int): 要保留的百分比
+        """
+        for shard, lock in zip(self.shards, self._locks):
+            with lock:
+                if len(shard):
+                    shard.shrink(percent)
+
+    def sweep(self):
+        """
+        逐一分片移除過期項目
+
+        回傳:
+        int: 移除的項目數量
+        """
+        removed = 0
+        for shard, lock in zip(self.shards, self._locks):
+            with lock:
+                removed += shard.sweep()
+        return removed
+
+    def stats(self):
+        """
+        回傳各分片合計的狀態
+
+        回傳:
+        dict: 包含項目數量、位元組數與分片數量的字典
+        """
+        total = {'entries': 0, 'bytes': 0}
+        for shard, lock in zip(self.shards, self._locks):
+            with lock:
+                total['entries'] += len(shard)
+                total['bytes'] += shard.bytes
+        total['shards'] = len(self.shards)
+        total['policy'] = self.shards[0].policy
+        return total
+
+    def snapshot(self):
+        """
+        回傳各分片合計的統計計數器快照
+
+        回傳:
+        dict: 與 Cache.snapshot() 相同的欄位，計數與延遲直方圖為各分片合計
+        """
+        snap = {'entries': 0, 'bytes': 0}
+        snap.update((name, 0) for name in _COUNTERS)
+        latency = None
+        for shard, lock in zip(self.shards, self._locks):
+            with lock:
+                snap['entries'] += len(shard)
+                snap['bytes'] += shard.bytes
+                for name in _COUNTERS:
+                    snap[name] += getattr(shard, name)
+                if shard.latency is not None:
+                    if latency is None:
+                        latency = {op: LatencyHistogram() for op in shard.latency}
+                    for op, h in shard.latency.items():
+                        latency[op].merge(h)
+        snap['shards'] = len(self.shards)
+        snap['policy'] = self.shards[0].policy
+        lookups = snap['hits'] + snap['misses']
+        snap['hit_ratio'] = snap['hits'] / lookups if lookups else 0.0
+        if latency is not None:
+            snap['latency'] = {op: h.to_dict() for op, h in latency.items()}
+        return snap
+
+
+class SingleFlight:
+    """
+    執行緒版本的請求合併
+
+    同一個鍵同時只會有一個執行緒真正執行載入函數，
+    其他執行緒等待並取得同一個結果，或收到同一個例外。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = dict()    # 鍵 -> 進行中的 Future
+
+    def do(self, key, fn, *args, **kwargs):
+        """
+        執行 fn(*args, **kwargs)，同一個鍵的並行呼叫只執行一次
+
+        參數:
+        key: 用來合併請求的鍵
+        fn (callable): 載入函數
+
+        回傳:
+        any: fn 的回傳值
+
+        備註:
+        fn 引發的例外會傳給所有等待中的呼叫者
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+        if not leader:
+            return future.result()
+
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                del self._calls[key]
+        return future.result()
+
+
+class AsyncSingleFlight:
+    """
+    asyncio 版本的請求合併
+
+    同一個鍵同時只會建立一個 Task，其他協程等待同一個 Task。
+    """
+
+    def __init__(self):
+        self._tasks = dict()    # 鍵 -> 進行中的 Task
+
+    async def do(self, key, coro_fn, *args, **kwargs):
+        """
+        等待 coro_fn(*args, **kwargs)，同一個鍵的並行呼叫只執行一次
+
+        參數:
+        key: 用來合併請求的鍵
+        coro_fn (callable): 回傳 coroutine 的載入函數
+
+        回傳:
+        any: coroutine 的結果
+
+        備註:
+        以 asyncio.shield 等待，單一呼叫者被取消時不會取消共用的載入
+        """
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(coro_fn(*args, **kwargs))
+            self._tasks[key] = task
+            task.add_done_callback(lambda _: self._tasks.pop(key, None))
+        return await asyncio.shield(task)
+
+
+class PickleCodec:
+    """
+    以 pickle 序列化磁碟儲存的鍵與值，可處理大部分的 Python 物件
+    """
+    protocol = 4    # 固定協定版本，讓相同的鍵在不同 Python 版本有相同的位元組
+
+    def encode(self, obj):
+        return pickle.dumps(obj, protocol=self.protocol)
+
+    def decode(self, data):
+        return pickle.loads(data)
+
+
+class JsonCodec:
+    """
+    以 JSON 序列化磁碟儲存的鍵與值，只適用於 JSON 可表示的資料，
+    但檔案內容可以被其他語言讀取
+    """
+
+    def encode(self, obj):
+        return json.dumps(obj, ensure_ascii=False, sort_keys=True).encode('utf-8')
+
+    def decode(self, data):
+        return json.loads(data)
+
+
+class DiskStore:
+    """
+    以 SQLite 實作的磁碟鍵值儲存
+
+    讀取透過 SQLite 的 mmap (PRAGMA mmap_size) 直接對應資料庫檔案，
+    不需要先把整個檔案複製進記憶體。
+    每一列記錄過期時間 (time.time()，NULL 表示永不過期)，
+    讀到已過期的列時刪除並視為不存在。
+    """
+
+    def __init__(self, path, codec=None, mmap_size=256 * 1024 * 1024):
+        """
+        開啟（或建立）磁碟儲存
+
+        參數:
+        path: SQLite 資料庫檔案路徑
+        codec: 具有 encode/decode 方法的序列化物件，預設為 PickleCodec
+        mmap_size (int): 允許 SQLite 對應到記憶體的最大位元組數
+        """
+        self.path = str(path)
+        self.codec = codec if codec is not None else PickleCodec()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(f'PRAGMA mmap_size = {int(mmap_size)}')
+        self._conn.execute('PRAGMA journal_mode = WAL')
+        self._conn.execute('CREATE TABLE IF NOT EXISTS cache '
+                           '(key BLOB PRIMARY KEY, value BLOB NOT NULL, expires REAL)')
+        columns = [row[1] for row in self._conn.execute('PRAGMA table_info(cache)')]
+        if 'expires' not in columns:
+            # 舊版建立的檔案沒有過期時間欄位，原有的列視為永不過期
+            self._conn.execute('ALTER TABLE cache ADD COLUMN expires REAL')
+        self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute(
+                'SELECT COUNT(*) FROM cache WHERE expires IS NULL OR expires > ?',
+                (time.time(),)).fetchone()[0]
+
+    def has(self, key):
+        try:
+            self.get_entry(key)
+        except KeyError:
+            return False
+        return True
+
+    def get_entry(self, key):
+        """
+        讀取指定的鍵與它的過期時間
+
+        回傳:
+        tuple: (值, 過期時間)，過期時間為 time.time() 的秒數，None 表示永不過期
+
+        備註:
+        如果鍵不存在或已過期，會引發 KeyError；已過期的列會在這裡刪除
+        """
+        encoded = self.codec.encode(key)
+        with self._lock:
+            row = self._conn.execute('SELECT value, expires FROM cache WHERE key = ?',
+                                     (encoded,)).fetchone()
+            if row is not None and row[1] is not None and time.time() >= row[1]:
+                self._conn.execute('DELETE FROM cache WHERE key = ?', (encoded,))
+                self._conn.commit()
+                row = None
+        if row is None:
+            raise KeyError(key)
+        return self.codec.decode(row[0]), row[1]
+
+    def get(self, key):
+        """
+        讀取指定的鍵
+
+        備註:
+        如果鍵不存在或已過期，會引發 KeyError
+        """
+        return self.get_entry(key)[0]
+
+    def put_many(self, items):
+        """
+        在同一個交易中寫入多個鍵值對
+
+        參數:
+        items: (鍵, 值) 或 (鍵, 值, 過期時間) 的可迭代物件；
+            過期時間為 time.time() 的秒數，省略或 None 表示永不過期
+        """
+        rows = [(self.codec.encode(item[0]), self.codec.encode(item[1]),
+                 item[2] if len(item) > 2 else None) for item in items]
+        with self._lock:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO cache (key, value, expires) VALUES (?, ?, ?)', rows)
+            self._conn.commit()
+
+    def sweep(self):
+        """
+        刪除所有已過期的列
+
+        回傳:
+        int: 刪除的列數
+        """
+        with self._lock:
+            removed = self._conn.execute('DELETE FROM cache WHERE expires <= ?',
+                                         (time.time(),)).rowcount
+            self._conn.commit()
+        return removed
+
+    def delete(self, key):
+        with self._lock:
+            self._conn.execute('DELETE FROM cache WHERE key = ?', (self.codec.encode(key),))
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class TieredCache:
+    """
+    兩層快取：記憶體 Cache 在前，DiskStore 在後
+
+    - add() 先寫入記憶體，磁碟寫入累積成批次後再一次寫出 (write-behind)；
+      待寫入的資料最多延後 flush_interval 秒（由計時器寫出），程式結束時也會寫出
+    - 記憶體未命中時才讀取磁碟，並把值以剩下的存活秒數載回記憶體，
+      重新啟動後熱門資料會隨著存取逐步載回，不需要一次載入全部
+    - 磁碟上的項目記錄過期時間，過期後不會再被載回
+    - purge/shrink 只縮減記憶體層，磁碟層保留所有資料
+    - 待寫入佇列以鎖保護；記憶體層使用 ShardedCache 時可以在多執行緒中共用
+
+    提供與 Cache 相同的 has/add/inc/get/purge/shrink 介面。
+    """
+
+    def __init__(self, store, memory=None, batch_size=100, flush_interval=1.0):
+        """
+        初始化兩層快取
+
+        參數:
+        store (DiskStore): 磁碟儲存
+        memory (Cache): 記憶體層，預設為 1000 項目的 LRU Cache；
+            它的 default_ttl 也用來計算磁碟項目的過期時間
+        batch_size (int): 累積多少筆待寫入資料後寫到磁碟
+        flush_interval (float): 待寫入資料最多延後的秒數
+        """
+        self.store = store
+        self.memory = memory if memory is not None else Cache(max_entries=1000, policy='lru')
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._pending = dict()      # 尚未寫到磁碟的 鍵: (值, 過期時間)
+        self._lock = threading.RLock()
+        self._timer = None
+        # 整體的統計計數器：get/lookup 每次計為一次命中或未命中，
+        # disk_hits 是其中由待寫入資料或磁碟取得的命中
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        atexit.register(self.flush)
+
+    def __len__(self):
+        return len(self.memory)
+
+    def __repr__(self):
+        return repr(self.memory)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def has(self, key):
+        if self.memory.has(key):
+            return True
+        try:
+            self._read(key)
+        except KeyError:
+            return False
+        return True
+
+    def _read(self, key):
+        """
+        從待寫入資料或磁碟讀取 (值, 過期時間)
+
+        備註:
+        如果鍵不存在或已過期，會引發 KeyError
+        """
+        with self._lock:
+            if key in self._pending:
+                value, expires = self._pending[key]
+                if expires is None or time.time() < expires:
+                    return value, expires
+                del self._pending[key]
+                raise KeyError(key)
+            return self.store.get_entry(key)
+
+    def _load(self, key):
+        """
+        從待寫入資料或磁碟載回記憶體，存活秒數為剩下的時間
+
+        備註:
+        如果鍵不存在或已過期，會引發 KeyError
+        """
+        value, expires = self._read(key)
+        self.memory.add(key, value, None if expires is None else expires - time.time())
+        return value
+
+    def add(self, key, value, ttl=None):
+        self.memory.add(key, value, ttl)
+        if ttl is None:
+            ttl = getattr(self.memory, 'default_ttl', None)
+        expires = None if ttl is None else time.time() + ttl
+        with self._lock:
+            self._pending[key] = (value, expires)
+            if len(self._pending) >= self.batch_size:
+                self.flush()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.flush_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def inc(self, key):
+        if not self.memory.has(key):
+            self._load(key)
+        self.memory.inc(key)
+
+    def _count(self, name):
+        """
+        以鎖保護的計數器加一
+        """
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def get(self, key):
+        try:
+            try:
+                value = self.memory.get(key)
+            except KeyError:
+                value = self._load(key)
+                self._count('disk_hits')
+        except KeyError:
+            self._count('misses')
+            raise
+        self._count('hits')
+        return value
+
+    def lookup(self, key, default=None):
+        value = self.memory.lookup(key, _MISSING)
+        if value is _MISSING:
+            try:
+                value = self._load(key)
+            except KeyError:
+                self._count('misses')
+                return default
+            self.memory.inc(key)
+            self._count('disk_hits')
+        self._count('hits')
+        return value
+
+    def purge(self, size=100):
+        self.memory.purge(size)
+
+    def shrink(self, percent=50):
+        self.memory.shrink(percent)
+
+    def stats(self):
+        """
+        回傳記憶體層的狀態，加上磁碟與待寫入的筆數
+        """
+        total = self.memory.stats()
+        total['disk_entries'] = len(self.store)
+        total['pending_writes'] = len(self._pending)
+        return total
+
+    def snapshot(self):
+        """
+        回傳整體的統計快照
+
+        hits/misses/hit_ratio 是兩層合計（每次 get/lookup 計一次），
+        記憶體層自己的計數改放在 memory_hits/memory_misses，
+        另外加上磁碟命中次數與尚未寫到磁碟的筆數
+        """
+        snap = self.memory.snapshot()
+        snap['memory_hits'], snap['memory_misses'] = snap['hits'], snap['misses']
+        with self._lock:
+            snap['hits'], snap['misses'] = self.hits, self.misses
+            snap['disk_hits'] = self.disk_hits
+            snap['pending_writes'] = len(self._pending)
+        lookups = snap['hits'] + snap['misses']
+        snap['hit_ratio'] = snap['hits'] / lookups if lookups else 0.0
+        return snap
+
+    def flush(self):
+        """
+        把累積的待寫入資料一次寫到磁碟
+
+        備註:
+        寫入期間持有鎖，其他執行緒不會在資料離開佇列、尚未寫到磁碟時讀不到它
+        """
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if self._pending:
+                self.store.put_many((key, value, expires)
+                                    for key, (value, expires) in self._pending.items())
+                self._pending.clear()
+
+    def close(self):
+        """
+        寫出所有待寫入資料、刪除磁碟上已過期的項目並關閉磁碟儲存
+        """
+        self.flush()
+        atexit.unregister(self.flush)
+        self.store.sweep()
+        self.store.close()
+
+
+class StatsExporter:
+    """
+    定期輸出快取統計
+
+    在背景執行緒中每隔 interval 秒呼叫一次 cache.snapshot()，
+    以 JSON Lines 格式附加到檔案，或寫成一行日誌，方便繪製命中率趨勢。
+    """
+
+    def __init__(self, cache, interval=60.0, path=None, log=None):
+        """
+        參數:
+        cache: 具有 snapshot() 方法的快取
+        interval (float): 輸出間隔秒數
+        path: JSON Lines 檔案路徑，None 表示不寫檔
+        log (logging.Logger): 輸出日誌的 logger；
+            path 與 log 都未指定時使用本模組的 logger
+        """
+        self.cache = cache
+        self.interval = interval
+        self.path = path
+        self.log = log if log is not None or path is not None else logger
+        self._stop = threading.Event()
+        self._thread = None
+
+    def export(self):
+        """
+        立即輸出一次統計
+
+        回傳:
+        dict: 輸出的統計內容（加上 time 欄位）
+        """
+        snap = self.cache.snapshot()
+        snap['time'] = time.time()
+        line = json.dumps(snap, ensure_ascii=False)
+        if self.path is not None:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+        if self.log is not None:
+            self.log.info(f'快取統計: {line}')
+        return snap
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.export()
+
+    def start(self):
+        """啟動背景輸出執行緒"""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """停止背景輸出執行緒，並輸出最後一次統計"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.export()
+
+
+# 關鍵字參數與位置參數之間的分隔記號
+_KWARGS_MARK = object()
+
+
+def _make_key(args, kwargs, typed):
+    """
+    由函數參數建立快取的鍵
+
+    備註:
+    typed 為 True 時，型別不同的參數（例如 3 與 3.0）視為不同的鍵
+    """
+    key = args
+    if kwargs:
+        key += (_KWARGS_MARK,) + tuple(sorted(kwargs.items()))
+    if typed:
+        key += tuple(type(v) for v in args)
+        if kwargs:
+            key += tuple(type(v) for _, v in sorted(kwargs.items()))
+    elif len(key) == 1 and type(key[0]) in (int, str):
+        return key[0]
+    return key
+
+
+def cached(cache=None, key=None, maxsize=128, typed=False, bottom_up=None, order=2):
+    """
+    以 Cache 記憶化函數結果的裝飾器
+
+    參數:
+    cache: 具有 lookup/add 方法的快取（Cache, ShardedCache, TieredCache）；
+        預設建立 max_entries=maxsize 的 LRU Cache
+    key (callable): 由參數建立鍵的函數 key(*args, **kwargs)
+    maxsize (int): 預設快取的項目上限，None 表示不限制
+    typed (bool): 是否以參數型別區分鍵（未指定 key 時）
+    bottom_up (int): 整數遞迴式的起始索引；設定後，以單一整數 n 呼叫
+        且未命中時，先由小到大依序計算到 n - 1，
+        讓每一層遞迴都直接命中快取，不會超過遞迴深度限制
+    order (int): bottom_up 遞迴式用到的前幾項數量（斐波那契為 2）；
+        填表時最後 order 個值另外保留在快取之外，
+        即使快取已經淘汰它們，之後更大的 n 仍可以從這裡接續
+
+    回傳:
+    callable: 裝飾後的函數，附帶 cache_info()、cache_clear() 與 cache 屬性
+
+    範例:
+    @cached(maxsize=16, bottom_up=1)
+    def fib(n):
+        return 1 if n <= 2 else fib(n - 1) + fib(n - 2)
+    """
+    if cache is None:
+        cache = Cache(max_entries=maxsize, policy='lru') if maxsize else Cache()
+
+    def decorator(func):
+        make_key = key if key is not None else (
+            lambda *args, **kwargs: _make_key(args, kwargs, typed))
+        stats = {'hits': 0, 'misses': 0}
+        fill = {'running': False}
+        seeds = deque(maxlen=order)     # 填表到最大索引時的最後 order 個 (索引, 值)
+
+        def fill_up_to(n):
+            """
+            由下而上計算到 n - 1
+
+            seeds 的最後一個索引小於 n 時，先把 seeds 放回快取再從下一個索引接續；
+            否則（n 不超過已填表的範圍，但它的前幾項可能已被淘汰）從 bottom_up 重新計算
+            """
+            start = bottom_up
+            if seeds and seeds[-1][0] < n:
+                for i, value in seeds:
+                    cache.add(make_key(i), value)
+                start = seeds[-1][0] + 1
+            fill['running'] = True
+            try:
+                for i in range(start, n):
+                    value = wrapper(i)
+                    if not seeds or i > seeds[-1][0]:
+                        seeds.append((i, value))
+            finally:
+                fill['running'] = False
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            k = make_key(*args, **kwargs)
+            value = cache.lookup(k, _MISSING)
+            if value is not _MISSING:
+                stats['hits'] += 1
+                return value
+
+            stats['misses'] += 1
+            if (bottom_up is not None and not fill['running'] and not kwargs and
+                    len(args) == 1 and type(args[0]) == int and args[0] > bottom_up):
+                fill_up_to(args[0])
+            value = func(*args, **kwargs)
+            cache.add(k, value)
+            return value
+
+        def cache_info():
+            """回傳命中統計與快取大小"""
+            return {'hits': stats['hits'], 'misses': stats['misses'],
+                    'size': len(cache), 'maxsize': maxsize}
+
+        def cache_clear():
+            """清空快取與統計"""
+            cache.purge(0)
+            stats['hits'] = stats['misses'] = 0
+            seeds.clear()
+
+        wrapper.cache = cache
+        wrapper.cache_info = cache_info
+        wrapper.cache_clear = cache_clear
+        return wrapper
+
+    return decorator
+
 
 if __name__ == '__main__':
     print("=== Cache 類別測試 ===")
@@ -197,3 +1821,194 @@ if __name__ == '__main__':
     cache.shrink(50)
     print("快取內容:")
     print(cache)
+
+    # 測試 LFU 模式
+    print("\n=== 測試 LFU 模式 (max_entries=3) ===")
+    lfu = Cache(max_entries=3, policy='lfu')
+    lfu.add("apple", "蘋果")
+    lfu.add("banana", "香蕉")
+    lfu.add("orange", "柳丁")
+    lfu.inc("apple")
+    lfu.inc("apple")
+    lfu.inc("orange")
+    print("加入芒果，自動淘汰存取次數最少的香蕉")
+    lfu.add("mango", "芒果")
+    print(lfu)
+    assert not lfu.has("banana") and len(lfu) == 3
+
+    print("執行 purge(1) - 只保留最常用的項目")
+    lfu.purge(1)
+    print(lfu)
+    assert lfu.has("apple") and len(lfu) == 1
+
+    # 測試記憶體上限
+    print("\n=== 測試記憶體上限 (max_bytes=2000) ===")
+    sized = Cache(max_bytes=2000, policy='lru')
+    for i in range(10):
+        sized.add(f"page{i}", "x" * 500)
+    print(sized)
+    print(f"統計: {sized.stats()}")
+    assert sized.bytes <= 2000 and not sized.has("page0")
+    sized.add("huge", "x" * 5000)
+    print(f"超過整個預算的值不快取，也不淘汰其他項目: {len(sized)} 個項目")
+    assert not sized.has("huge") and sized.has("page9") and len(sized) == 3
+
+    # 測試存活時間
+    print("\n=== 測試存活時間 (default_ttl=0.2 秒) ===")
+    timed = Cache(default_ttl=0.2)
+    timed.add("news", "今日新聞")
+    timed.add("logo", "標誌圖片", ttl=60)
+    time.sleep(0.3)
+    print(f"0.3 秒後清除過期項目: {timed.sweep()} 個，剩下 {len(timed)} 個")
+    print(f"新聞還在嗎? {'是' if timed.has('news') else '否'}")
+    assert not timed.has("news") and timed.has("logo")
+
+    # 測試 stale-while-revalidate
+    print("\n=== 測試 stale-while-revalidate ===")
+    versions = itertools.count(2)
+    swr = Cache(default_ttl=0.2, stale_ttl=5, loader=lambda key: f"{key} v{next(versions)}")
+    swr.add("weather", "weather v1")
+    time.sleep(0.3)
+    print(f"過期後先回傳舊值: {swr.get('weather')}")
+    time.sleep(0.1)
+    print(f"背景重新載入後: {swr.get('weather')}")
+    assert swr.get("weather") == "weather v2"
+    swr.add("stock", "stock v1", ttl=0.1)
+    time.sleep(0.15)
+    swr.get("stock")
+    time.sleep(0.1)
+    print(f"指定 ttl 的項目重新載入後: {swr.get('stock')}，沿用自己的 ttl=0.1 秒")
+    assert swr.get("stock") == "stock v3" and swr.cache["stock"][3] - time.monotonic() <= 0.1
+
+    # 測試分片快取
+    print("\n=== 測試分片快取 (8 個執行緒, 4 個分片) ===")
+    sharded = ShardedCache(n_shards=4, max_entries=100, policy='lru')
+
+    def worker(seed):
+        for i in range(2000):
+            key = (seed * 7 + i) % 300
+            if sharded.lookup(key) is None:
+                sharded.add(key, key * key)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    sharded.purge(40)
+    print(sharded)
+    print(f"統計: {sharded.stats()}")
+    assert len(sharded) <= 40
+
+    # 測試請求合併
+    print("\n=== 測試請求合併 (20 個執行緒同時未命中) ===")
+    flight = SingleFlight()
+    loads = []
+
+    def slow_load(key):
+        loads.append(key)
+        time.sleep(0.2)
+        return f"{key} 的內容"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do("page", slow_load, "page")))
+               for _ in range(20)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    print(f"載入次數: {len(loads)}，取得結果: {len(results)} 個")
+    assert len(loads) == 1 and set(results) == {"page 的內容"}
+
+    # 測試兩層快取
+    print("\n=== 測試兩層快取 (記憶體 + SQLite) ===")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = f'{tmp_dir}/cache.db'
+        with TieredCache(DiskStore(db_path), batch_size=10) as tiered:
+            for i in range(25):
+                tiered.add(f"item{i}", {"id": i, "name": f"項目 {i}"})
+        print("重新開啟，模擬程式重新啟動...")
+        with TieredCache(DiskStore(db_path, mmap_size=1024 * 1024)) as tiered:
+            print(f"記憶體中的項目: {len(tiered)}，磁碟中的項目: {len(tiered.store)}")
+            print(f"item7 = {tiered.get('item7')}")
+            print(f"載回後記憶體中的項目: {len(tiered)}")
+            assert len(tiered.store) == 25 and len(tiered) == 1
+
+        print("有存活時間的項目：記憶體層淘汰後，磁碟上的項目同樣會過期")
+        with TieredCache(DiskStore(db_path), memory=Cache(max_entries=1, policy='lru'),
+                         flush_interval=0.05) as tiered:
+            tiered.add("session", "登入資訊", ttl=0.3)
+            tiered.add("other", "擠掉 session")
+            time.sleep(0.1)
+            print(f"計時器寫出後待寫入筆數: {tiered.snapshot()['pending_writes']}，"
+                  f"session 在磁碟上嗎? {'是' if tiered.store.has('session') else '否'}")
+            assert tiered.store.has("session") and tiered.get("session") == "登入資訊"
+            tiered.add("other", "再次擠掉 session")
+            time.sleep(0.3)
+            print(f"0.4 秒後 session 還在嗎? {'是' if tiered.has('session') else '否'}")
+            assert not tiered.has("session") and tiered.lookup("session") is None
+
+        print("8 個執行緒共用一個兩層快取")
+        with TieredCache(DiskStore(db_path), memory=ShardedCache(n_shards=4, max_entries=50,
+                                                                 policy='lru'),
+                         batch_size=20) as tiered:
+            def tiered_worker(seed):
+                for i in range(500):
+                    key = (seed * 31 + i) % 200
+                    if tiered.lookup(key) is None:
+                        tiered.add(key, key * key)
+
+            threads = [threading.Thread(target=tiered_worker, args=(n,)) for n in range(8)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            tiered.flush()
+            snap = tiered.snapshot()
+            print(f"統計: {tiered.stats()}")
+            print(f"命中 {snap['hits']}（其中磁碟 {snap['disk_hits']}）、未命中 {snap['misses']}，"
+                  f"命中率 {snap['hit_ratio']:.2%}")
+            assert snap['hits'] + snap['misses'] == 8 * 500 and snap['disk_hits'] > 0
+            assert all(tiered.get(key) == key * key for key in range(200))
+
+    # 測試記憶化裝飾器
+    print("\n=== 測試記憶化裝飾器 ===")
+
+    @cached(maxsize=8, typed=True)
+    def square(x):
+        return x * x
+
+    print(f"square(3) = {square(3)}, square(3.0) = {square(3.0)}, square(3) = {square(3)}")
+    print(f"統計: {square.cache_info()}")
+    assert square.cache_info()['hits'] == 1 and square.cache_info()['misses'] == 2
+
+    @cached(maxsize=4, bottom_up=0, order=3)
+    def tribonacci(n):
+        if n < 3:
+            return (0, 0, 1)[n]
+        return tribonacci(n - 1) + tribonacci(n - 2) + tribonacci(n - 3)
+
+    print(f"tribonacci(5000) 有 {tribonacci(5000).bit_length()} 位元，不會超過遞迴深度限制")
+    for n in range(3, 200):
+        tribonacci(n)       # 小的 n 把快取中接近 5000 的項目全部淘汰
+    print(f"tribonacci(5001) 有 {tribonacci(5001).bit_length()} 位元，由保留的前幾項接續")
+
+    # 測試統計與監控
+    print("\n=== 測試統計與監控 ===")
+    watched = Cache(max_entries=50, policy='lru', timing=True)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        exporter = StatsExporter(watched, interval=0.05, path=f'{tmp_dir}/stats.jsonl').start()
+        for i in range(1000):
+            key = i % 60 if i % 2 else i % 20
+            if watched.lookup(key) is None:
+                watched.add(key, key)
+        time.sleep(0.2)
+        exporter.stop()
+        with open(f'{tmp_dir}/stats.jsonl', encoding='utf-8') as f:
+            lines = f.readlines()
+    snap = watched.snapshot()
+    print(f"命中 {snap['hits']}、未命中 {snap['misses']}、淘汰 {snap['evictions']}，"
+          f"命中率 {snap['hit_ratio']:.2%}")
+    print(f"get 延遲: {snap['latency']['get']}")
+    print(f"輸出了 {len(lines)} 行 JSON 統計")
+    assert snap['hits'] + snap['misses'] == 1000 and lines
@@ -0,0 +1,300 @@
+"""
+factorLib.py - 整數質因數分解函數庫
+
+此模組建立在 primeLib 之上，提供整數的質因數分解功能。
+
+主要功能：
+1. factorize: 分解單一整數，回傳 {質數: 次方} 的字典
+   - 先以快取的小質數表 (TRIAL_LIMIT 以內) 試除
+   - 剩下的部分以 primeLib.is_prime (Miller–Rabin / BPSW) 判斷是否為質數
+   - 合數以 Pollard–Rho（Brent 的循環偵測與批次 gcd）拆開
+2. factorize_many: 批次分解，結果存放在 LRU 快取 (cacheLib.Cache) 中，
+   未命中的數字夠多時分段交給 ProcessPoolExecutor
+3. SPFSieve / use_spf_sieve: 最小質因數 (smallest prime factor) 篩表，
+   上限以內的數字可以在 O(log n) 時間內分解
+4. main: 示範與效能測試函數
+
+使用方式：
+- 直接執行模組：python factorLib.py
+- 匯入特定函數：from factorLib import factorize, factorize_many
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional
+import math
+import os
+import random
+import time
+import numpy as np
+from cacheLib import Cache
+from primeLib import is_prime, primes_range
+
+# 試除使用的小質數上限；試除後剩下小於 TRIAL_LIMIT² 的數字一定是質數
+TRIAL_LIMIT = 1 << 10
+
+# 快取的小質數表
+_TRIAL_PRIMES = list(primes_range(2, TRIAL_LIMIT))
+
+# Brent 演算法每批累乘多少個差值才做一次 gcd
+BRENT_BATCH = 128
+
+# factorize_many 的 LRU 快取容量
+MEMO_SIZE = 100_000
+
+# factorize_many: 未命中的數字達到這個數量，且有多個 CPU 時才使用 process pool
+POOL_MIN_SIZE = 2_000
+
+# factorize_many: 每個 process pool 工作的數字個數
+POOL_CHUNK_SIZE = 500
+
+# use_spf_sieve 的預設上限
+SPF_LIMIT = 1 << 20
+
+# factorize_many 的結果快取：鍵為整數，值為 ((質數, 次方), ...) 的元組
+_MEMO = Cache(max_entries=MEMO_SIZE, policy='lru')
+
+# 目前使用中的最小質因數篩表（由 use_spf_sieve 設定），factorize 會先查表
+_SPF = None
+
+
+class SPFSieve:
+    """
+    最小質因數篩表：spf[n] 為 n 的最小質因數
+
+    以 NumPy 篩法建立，每個數字佔 4 個位元組；
+    分解 n < limit 時只需要反覆查表與整除，時間為 O(log n)
+
+    Args:
+        limit (int): 篩表涵蓋的範圍 [0, limit)，不能超過 2^32
+    """
+
+    def __init__(self, limit=SPF_LIMIT):
+        if not 2 <= limit <= 1 << 32:
+            raise ValueError("limit 必須介於 2 與 2^32 之間")
+        self.limit = limit
+        spf = np.zeros(limit, dtype=np.uint32)
+        spf[2::2] = 2
+        for p in primes_range(3, math.isqrt(limit - 1) + 1):
+            view = spf[p * p::2 * p]            # 只需要標記奇數倍數
+            view[view == 0] = p
+        primes = np.flatnonzero(spf == 0)
+        spf[primes] = primes                    # 沒有被標記的數字是質數
+        spf[:2] = 0
+        self._spf = spf
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}(limit={self.limit:,})'
+
+    def __contains__(self, n):
+        return 2 <= n < self.limit
+
+    def smallest_factor(self, n):
+        """
+        回傳 n 的最小質因數
+
+        Args:
+            n (int): 2 <= n < limit
+
+        Returns:
+            int: 最小質因數
+        """
+        return int(self._spf[n])
+
+    def factorize(self, n):
+        """
+        以查表分解 n
+
+        Args:
+            n (int): 2 <= n < limit
+
+        Returns:
+            dict: {質數: 次方}，依質數由小到大排列
+        """
+        factors = {}
+        spf = self._spf
+        while n > 1:
+            p = int(spf[n])
+            n //= p
+            factors[p] = factors.get(p, 0) + 1
+        return factors
+
+
+def use_spf_sieve(limit: int = SPF_LIMIT) -> SPFSieve:
+    """
+    建立最小質因數篩表，並讓 factorize 對表內的數字直接查表
+
+    Args:
+        limit (int): 篩表涵蓋的範圍 [0, limit)
+
+    Returns:
+        SPFSieve: 已建立的篩表
+    """
+    global _SPF
+    if _SPF is None or _SPF.limit < limit:
+        _SPF = SPFSieve(limit)
+    return _SPF
+
+
+def _pollard_brent(n: int) -> int:
+    """
+    以 Pollard–Rho（Brent 變形）找出合數 n 的一個非平凡因數
+
+    使用 f(x) = x² + c (mod n)，以 Brent 的方法偵測循環，
+    每 BRENT_BATCH 個差值累乘後才做一次 gcd；失敗時換一組 c 重試
+
+    Args:
+        n (int): 不含小因數的奇合數
+
+    Returns:
+        int: n 的一個因數 d，1 < d < n
+    """
+    while True:
+        y, c = random.randrange(1, n), random.randrange(1, n)
+        g = r = q = 1
+        while g == 1:
+            x = y
+            for _ in range(r):
+                y = (y * y + c) % n
+            k = 0
+            while k < r and g == 1:
+                ys = y
+                for _ in range(min(BRENT_BATCH, r - k)):
+                    y = (y * y + c) % n
+                    q = q * abs(x - y) % n
+                g = math.gcd(q, n)
+                k += BRENT_BATCH
+            r *= 2
+        if g == n:
+            # 批次中的累乘剛好變成 0，回到這一批的起點逐步找出因數
+            while True:
+                ys = (ys * ys + c) % n
+                g = math.gcd(abs(x - ys), n)
+                if g > 1:
+                    break
+        if g != n:
+            return g
+
+
+def factorize(n: int) -> Dict[int, int]:
+    """
+    將正整數分解為質因數
+
+    Args:
+        n (int): 需要分解的正整數
+
+    Returns:
+        dict: {質數: 次方}，依質數由小到大排列；n = 1 時為空字典
+
+    Raises:
+        TypeError: 如果輸入不是整數
+        ValueError: 如果輸入小於 1
+    """
+    if not isinstance(n, int):
+        raise TypeError("輸入必須為整數")
+    if n < 1:
+        raise ValueError("輸入必須為正整數")
+    if _SPF is not None and n in _SPF:
+        return _SPF.factorize(n)
+
+    factors = {}
+    for p in _TRIAL_PRIMES:
+        if p * p > n:
+            break
+        if n % p == 0:
+            e = 0
+            while n % p == 0:
+                n //= p
+                e += 1
+            factors[p] = e
+
+    stack = [n] if n > 1 else []
+    while stack:
+        m = stack.pop()
+        if m < TRIAL_LIMIT * TRIAL_LIMIT or is_prime(m):
+            factors[m] = factors.get(m, 0) + 1
+        else:
+            d = _pollard_brent(m)
+            stack += [d, m // d]
+    return dict(sorted(factors.items()))
+
+
+def _factorize_chunk(chunk: List[int]) -> List[tuple]:
+    """
+    process pool 的工作函數：逐一分解一段數字
+    """
+    return [tuple(factorize(n).items()) for n in chunk]
+
+
+def factorize_many(values: Iterable[int], workers: Optional[int] = None) -> List[Dict[int, int]]:
+    """
+    批次分解多個正整數
+
+    結果存放在容量為 MEMO_SIZE 的 LRU 快取中，重複的數字只分解一次；
+    指定了 workers，或未命中的數字不少於 POOL_MIN_SIZE 且有多個 CPU 時，
+    未命中的數字分段交給 ProcessPoolExecutor
+
+    Args:
+        values: 正整數的可迭代物件
+        workers (int, optional): process pool 的行程數，預設為 CPU 數量
+
+    Returns:
+        list: 與輸入順序相同的 {質數: 次方} 字典列表
+    """
+    values = list(values)
+    found = {}
+    for n in values:
+        if n not in found:
+            found[n] = _MEMO.lookup(n)
+    misses = [n for n, result in found.items() if result is None]
+
+    if misses:
+        use_pool = workers is not None or (
+            len(misses) >= POOL_MIN_SIZE and (os.cpu_count() or 1) > 1)
+        if use_pool:
+            chunks = [misses[i:i + POOL_CHUNK_SIZE]
+                      for i in range(0, len(misses), POOL_CHUNK_SIZE)]
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = [r for chunk in executor.map(_factorize_chunk, chunks) for r in chunk]
+        else:
+            results = _factorize_chunk(misses)
+        for n, result in zip(misses, results):
+            found[n] = result
+            _MEMO.add(n, result)
+
+    return [dict(found[n]) for n in values]
+
+
+if __name__ == '__main__':
+    """
+    主程式函數，用於測試各個分解函數
+    """
+
+    # 測試單一數字的分解
+    print("\n質因數分解:")
+    for n in [1, 2, 360, 2**32 + 1, 600851475143, 2**64 - 1,
+              4_294_967_291 * 4_294_967_279, (2**61 - 1) * (2**31 - 1)]:
+        start_time = time.time()
+        factors = factorize(n)
+        print(f"{n:,} = {factors} ({time.time() - start_time:.6f} 秒)")
+
+    # 測試批次分解與快取
+    rng = random.Random(2025)
+    values = [rng.randrange(2**40, 2**64) for _ in range(2_000)]
+    for label in ["第一次", "第二次（快取命中）"]:
+        start_time = time.time()
+        results = factorize_many(values)
+        print(f"\nfactorize_many {len(values):,} 個 40~64 位元整數 {label}: "
+              f"{time.time() - start_time:.6f} 秒")
+    assert all(math.prod(p ** e for p, e in f.items()) == n for n, f in zip(values, results))
+    print(f"快取項目數: {len(_MEMO):,}")
+
+    # 測試最小質因數篩表
+    start_time = time.time()
+    sieve = use_spf_sieve(10**7)
+    print(f"\n建立 {sieve} ({time.time() - start_time:.6f} 秒)")
+    start_time = time.time()
+    for n in range(9_000_000, 9_100_000):
+        factorize(n)
+    print(f"以篩表分解 100,000 個數字: {time.time() - start_time:.6f} 秒")
+    print(f"factorize(9,999,991) = {factorize(9_999_991)}")
+    print(f"factorize(9,699,690) = {factorize(9_699_690)}")
@@ -1,7 +1,7 @@
 """
 斐波那契數列計算與效能分析
 
-本程式實現了斐波那契數列的兩種計算方法，並提供效能比較和多種展示方式：
+本程式實現了斐波那契數列的多種計算方法，並提供效能比較和多種展示方式：
 
 1. 基本實現:
    - 純遞迴實現 (fibo 函數)
@@ -13,14 +13,21 @@
    - 最大快取容量為 1000
    - 显著提升重複計算的效能
 
-3. 功能特點:
-   - 效能比較工具 (compare_performance)
+3. O(log n) 實現:
+   - 快速倍增法 (fibonacci_doubling 函數)，單一數值最快
+   - 矩陣快速冪 (fibonacci_matrix 函數)，以 recurrenceLib.linear_recurrence 計算，
+     可處理任意常係數線性遞迴，並可取模
+   - 串流生成器 (fib_stream 函數)，以快速倍增定位起點後逐項相加，
+     適合連續的一段數列
+
+4. 功能特點:
+   - 效能比較工具 (compare_performance)，大數部分測到 n = 10^7
    - 多種資料結構展示 (display_results)
    - 異常處理機制 (test_abnormal_case)
    - 完整的日誌系統
    - 環境變數配置支援
 
-4. 日誌系統:
+5. 日誌系統:
    - 支援 DEBUG 和 INFO 兩種日誌等級
    - 同時輸出到控制台和日誌檔案
    - 日誌檔案每次運行時重新創建
@@ -40,16 +47,21 @@
 注意事項:
 - 程式會自動創建 logger 目錄和 fibo.log 檔案
 - 日誌檔案每次運行時都會重新創建
-- 可以通過修改 max_loop 參數調整效能測試範圍
+- 可以通過修改 max_loop 與 max_n 參數調整效能測試範圍
+- fibo 與 fibonacci 是遞迴實現：fibo 為指數時間，fibonacci 在 n 約 1000 時
+  會超過遞迴深度上限，大數請使用 fibonacci_doubling 或 fibonacci_matrix
 """
 
 import time
 import logging
 from pathlib import Path
 from functools import lru_cache
+from itertools import islice
+from typing import Iterator, Optional
 import os
 import traceback
 from dotenv import load_dotenv
+from recurrenceLib import check_mod, linear_recurrence
 
 # 載入環境變數
 load_dotenv()
@@ -168,12 +180,108 @@ def fibonacci(n: int) -> int:
         return 1
     return fibonacci(n - 1) + fibonacci(n - 2)
 
-def compare_performance(max_loop: int = 30) -> None:
+def fibonacci_doubling(n: int) -> int:
     """
-    比較兩種斐波那契數列實現的效能
-    
+    使用快速倍增法的斐波那契數列計算，時間為 O(log n) 次大數乘法
+
+    Args:
+        n (int): 要計算的斐波那契數列位置
+
+    Returns:
+        int: 斐波那契數列的第 n 個元素
+
+    Raises:
+        TypeError: 如果輸入不是整數
+        ValueError: 如果輸入不是正整數
+
+    說明:
+        由 n 的最高位元往下，維持 (F(k), F(k+1))，利用
+        F(2k) = F(k) * (2F(k+1) - F(k))
+        F(2k+1) = F(k)^2 + F(k+1)^2
+        每個位元 k 加倍，位元為 1 時再前進一項
+    """
+    if type(n) != int:
+        raise TypeError("輸入必須為整數")
+    elif n < 1:
+        raise ValueError("輸入必須為正整數")
+
+    a, b = 0, 1
+    for bit in bin(n)[2:]:
+        c = a * (2*b - a)
+        d = a*a + b*b
+        a, b = (d, c + d) if bit == '1' else (c, d)
+    return a
+
+
+def fibonacci_matrix(n: int, mod: Optional[int] = None) -> int:
+    """
+    使用 2×2 矩陣快速冪的斐波那契數列計算
+
     Args:
-        max_loop (int): 測試的最大範圍
+        n (int): 要計算的斐波那契數列位置
+        mod (int, optional): 指定時回傳 F(n) mod m
+
+    Returns:
+        int: 斐波那契數列的第 n 個元素
+
+    Raises:
+        TypeError: 如果輸入或 mod 不是整數
+        ValueError: 如果輸入或 mod 不是正整數
+    """
+    if type(n) != int:
+        raise TypeError("輸入必須為整數")
+    elif n < 1:
+        raise ValueError("輸入必須為正整數")
+    check_mod(mod)
+    return linear_recurrence(n, (1, 1), (0, 1), mod)
+
+
+def fib_stream(start: int = 1, stop: Optional[int] = None) -> Iterator[int]:
+    """
+    依序產生 F(start), F(start+1), ..., F(stop-1) 的生成器
+
+    Args:
+        start (int): 起始位置
+        stop (int, optional): 結束位置（不含），None 表示無限產生
+
+    Yields:
+        int: 斐波那契數列的下一個元素
+
+    Raises:
+        TypeError: 如果 start 或 stop 不是整數（呼叫時立即檢查，不必等到迭代）
+        ValueError: 如果 start 不是正整數
+
+    說明:
+        以快速倍增法取得 F(start-1) 與 F(start) 後，每一項只需要一次加法，
+        不必從頭計算
+    """
+    if type(start) != int or (stop is not None and type(stop) != int):
+        raise TypeError("輸入必須為整數")
+    elif start < 1:
+        raise ValueError("輸入必須為正整數")
+    return _fib_stream(start, stop)
+
+
+def _fib_stream(start: int, stop: Optional[int]) -> Iterator[int]:
+    """
+    fib_stream 的生成器本體（參數已檢查）
+    """
+    a = fibonacci_doubling(start - 1) if start > 1 else 0
+    b = fibonacci_doubling(start)
+    n = start
+    while stop is None or n < stop:
+        yield b
+        a, b = b, a + b
+        n += 1
+
+
+def compare_performance(max_loop: int = 30, max_n: int = 10**7) -> None:
+    """
+    比較斐波那契數列各實現的效能
+
+    Args:
+        max_loop (int): 遞迴版本測試的最大範圍
+        max_n (int): 大數測試的最大位置，從 1000 開始每次乘以 10
     """
     # 測量不使用快取的版本
     logger.debug(f'{get_function_name()}:測量不使用快取的版本')
@@ -197,6 +305,28 @@ def compare_performance(max_loop: int = 30) -> None:
     logger.debug(f'{get_function_name()}:比較結果')
     print(f'比較：不使用快取的版本花費了 {cacheless_time/cached_time:.1f} 倍的時間。\n')
 
+    # 測量大數的版本
+    logger.debug(f'{get_function_name()}:測量大數的版本')
+    print(f'{"n":>12} {"位數":>10} {"LRU 快取":>12} {"快速倍增":>12} {"矩陣快速冪":>12} {"串流 1000 項":>12}')
+    n = 1000
+    while n <= max_n:
+        fibonacci.cache_clear()
+        timings, values = [], set()
+        for func in (fibonacci, fibonacci_doubling, fibonacci_matrix,
+                     lambda n: list(islice(fib_stream(n), 1000))[0]):
+            t5 = time.time()
+            try:
+                values.add(func(n))
+                timings.append(f'{time.time() - t5:>12.6f}')
+            except RecursionError:
+                timings.append(f'{"RecursionError":>12}')
+        assert len(values) == 1, f'n = {n} 的結果不一致'
+        digits = int(n * 0.20898764024997873) + 1   # log10(黃金比例)
+        logger.debug(f'{get_function_name()}:{n}:{" ".join(timings)}')
+        print(f'{n:>12,} {digits:>10,} {" ".join(timings)}')
+        n *= 10
+    print()
+
 def display_results() -> None:
     """
     顯示斐波那契數列在不同資料結構中的表示
@@ -212,6 +342,19 @@ def display_results() -> None:
     logger.debug(f'{get_function_name()}:斐波那契數列在元組中：\n===>{fib_tuple}\n')
     print(f'斐波那契數列在元組中：\n===>{fib_tuple}\n')
 
+    # 斐波那契數列的串流
+    fib_range = list(fib_stream(100, 105))
+    logger.debug(f'{get_function_name()}:斐波那契數列的串流 F(100)~F(104)：\n===>{fib_range}\n')
+    print(f'斐波那契數列的串流 F(100)~F(104)：\n===>{fib_range}\n')
+
+    # 其他二階線性遞迴: Lucas 數與 Pell 數
+    lucas = [linear_recurrence(n, (1, 1), (2, 1)) for n in range(10)]
+    pell = [linear_recurrence(n, (2, 1), (0, 1)) for n in range(10)]
+    print(f'Lucas 數：\n===>{lucas}\nPell 數：\n===>{pell}\n')
+
+    # 取模
+    print(f'F(10^18) mod 1,000,000,007：\n===>{fibonacci_matrix(10**18, 1_000_000_007)}\n')
+
 def test_abnormal_case() -> None:
     """
     測試異常情況
@@ -0,0 +1,152 @@
+"""
+比較 cacheLib.Cache 各種淘汰策略的命中率與吞吐量
+
+這個程式會:
+1. 讀取命令列指定的鍵軌跡檔 (trace)：每行一個鍵
+2. 另外以固定的亂數種子產生三種合成軌跡（每次執行結果相同）：
+   - zipf: 少數熱門鍵佔大多數存取
+   - zipf+scan: 熱門存取中穿插一次性的大範圍掃描
+   - pages: 網頁存取，熱門網頁隨時間輪替
+3. 以相同容量重播每條軌跡，回報每個策略的命中率與每秒操作數
+
+使用方式:
+    python perfCachePolicies.py [trace.txt ...]
+"""
+
+import random
+import sys
+import time
+from pathlib import Path
+from cacheLib import Cache
+
+# 比較的淘汰策略
+POLICIES = ('lru', 'lfu', 'arc', '2q', 'tinylfu')
+
+# 快取容量
+CAPACITY = 500
+
+def load_trace(path):
+    """
+    讀取鍵軌跡檔
+
+    Args:
+        path: 軌跡檔路徑，每行一個鍵
+
+    Returns:
+        list: 鍵的列表（忽略空行）
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def zipf_trace(length=100_000, universe=20_000, seed=1):
+    """
+    產生 Zipf 分佈的合成軌跡
+
+    Args:
+        length: 存取次數
+        universe: 不同鍵的數量
+        seed: 亂數種子
+
+    Returns:
+        list: 鍵的列表
+    """
+    rng = random.Random(seed)
+    weights = [1 / rank for rank in range(1, universe + 1)]
+    return [f'k{k}' for k in rng.choices(range(universe), weights, k=length)]
+
+
+def scan_trace(length=100_000, universe=20_000, scan_every=10_000, scan_len=2_000, seed=2):
+    """
+    產生穿插掃描的 Zipf 軌跡，用來模擬會沖掉熱門資料的掃描階段
+
+    Args:
+        length: 熱門存取次數
+        universe: 熱門鍵的數量
+        scan_every: 每隔多少次存取插入一次掃描
+        scan_len: 每次掃描的長度（掃描的鍵只出現一次）
+        seed: 亂數種子
+
+    Returns:
+        list: 鍵的列表
+    """
+    trace = []
+    scan_id = 0
+    for i, key in enumerate(zipf_trace(length, universe, seed)):
+        if i % scan_every == 0:
+            trace.extend(f's{scan_id + j}' for j in range(scan_len))
+            scan_id += scan_len
+        trace.append(key)
+    return trace
+
+
+def page_trace(length=100_000, pages=20_000, phase_len=25_000, seed=3):
+    """
+    產生網頁存取的合成軌跡，熱門網頁每個階段輪替一次
+
+    Args:
+        length: 存取次數
+        pages: 網頁數量
+        phase_len: 每個階段的存取次數，階段之間熱門網頁重新洗牌
+        seed: 亂數種子
+
+    Returns:
+        list: 網址的列表
+    """
+    rng = random.Random(seed)
+    weights = [1 / rank for rank in range(1, pages + 1)]
+    ranking = list(range(pages))
+    trace = []
+    while len(trace) < length:
+        rng.shuffle(ranking)
+        count = min(phase_len, length - len(trace))
+        trace.extend(f'https://example.com/page/{ranking[r]}'
+                     for r in rng.choices(range(pages), weights, k=count))
+    return trace
+
+
+def replay(policy, trace, capacity=CAPACITY):
+    """
+    以指定策略重播軌跡
+
+    Args:
+        policy: 淘汰策略名稱
+        trace: 鍵的列表
+        capacity: 快取容量
+
+    Returns:
+        tuple: (命中率, 每秒操作數)
+    """
+    cache = Cache(max_entries=capacity, policy=policy)
+    hits = 0
+    start_time = time.perf_counter()
+    for key in trace:
+        if cache.has(key):
+            cache.inc(key)
+            hits += 1
+        else:
+            cache.add(key, key)
+    elapsed = time.perf_counter() - start_time
+    return hits / len(trace), len(trace) / elapsed
+
+
+def main():
+    """
+    主函數，重播所有軌跡並列印比較表
+    """
+    traces = {}
+    for path in sys.argv[1:]:
+        traces[Path(path).name] = load_trace(path)
+    traces['zipf'] = zipf_trace()
+    traces['zipf+scan'] = scan_trace()
+    traces['pages'] = page_trace()
+
+    for name, trace in traces.items():
+        print(f'\n=== 軌跡 {name}: {len(trace):,} 次存取，容量 {CAPACITY} ===')
+        for policy in POLICIES:
+            hit_ratio, ops = replay(policy, trace)
+            print(f'===>{policy:>8}: 命中率 {hit_ratio:7.2%}  {ops:12,.0f} ops/秒')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+比較單一鎖與分片鎖快取在多執行緒下的吞吐量
+
+這個程式會:
+1. 建立兩種執行緒安全的快取：
+   - 單一鎖：ShardedCache(n_shards=1)，所有執行緒共用一把鎖
+   - 分片鎖：ShardedCache(n_shards=16)，每個分片各自上鎖
+2. 以 1 到 32 個執行緒同時執行相同的查詢/加入工作量
+3. 列印每種組合的總吞吐量 (ops/秒)
+
+備註:
+CPython 的 GIL 讓純 Python 的運算無法真正平行，
+分片主要減少的是鎖的等待與執行緒切換，而不是 CPU 時間
+"""
+
+import random
+import threading
+import time
+from cacheLib import ShardedCache
+
+# 執行緒數量
+THREAD_COUNTS = (1, 2, 4, 8, 16, 32)
+
+# 每個執行緒的操作次數
+OPS_PER_THREAD = 20_000
+
+# 快取容量與鍵的範圍
+CAPACITY = 5_000
+KEY_SPACE = 10_000
+
+
+def worker(cache, seed, barrier):
+    """
+    執行緒工作：查詢隨機鍵，未命中時加入
+
+    Args:
+        cache: 要測試的快取
+        seed: 亂數種子
+        barrier: 讓所有執行緒同時開始的屏障
+    """
+    rng = random.Random(seed)
+    keys = [rng.randrange(KEY_SPACE) for _ in range(OPS_PER_THREAD)]
+    barrier.wait()
+    for key in keys:
+        if cache.lookup(key) is None:
+            cache.add(key, key)
+
+
+def measure(n_shards, n_threads):
+    """
+    測量指定分片數與執行緒數的吞吐量
+
+    Args:
+        n_shards: 分片數量
+        n_threads: 執行緒數量
+
+    Returns:
+        float: 每秒操作數
+    """
+    cache = ShardedCache(n_shards=n_shards, max_entries=CAPACITY, policy='lru')
+    barrier = threading.Barrier(n_threads + 1)
+    threads = [threading.Thread(target=worker, args=(cache, seed, barrier))
+               for seed in range(n_threads)]
+    for t in threads:
+        t.start()
+    barrier.wait()
+    start_time = time.perf_counter()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start_time
+    return n_threads * OPS_PER_THREAD / elapsed
+
+
+def main():
+    """
+    主函數，執行競爭測試並列印比較表
+    """
+    print(f'{"執行緒":>6} {"單一鎖 ops/秒":>16} {"16 分片 ops/秒":>16}')
+    for n_threads in THREAD_COUNTS:
+        single = measure(1, n_threads)
+        sharded = measure(16, n_threads)
+        print(f'{n_threads:>6} {single:>16,.0f} {sharded:>16,.0f}')
+
+
+if __name__ == "__main__":
+    main()
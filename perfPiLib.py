@@ -0,0 +1,78 @@
+"""
+piLib 精確度掃描的效能回歸測試
+
+這個程式會:
+1. 以 piLib.measure_all_methods 掃描 100 到 10^6 位的目標位數
+2. 把結果寫成 <輸出前綴>.csv 與 <輸出前綴>.json
+3. 如果指定了基準 JSON（先前執行的輸出），逐筆比較：
+   - 最小時間比基準慢超過 REGRESSION_RATIO 倍
+   - 正確位數比基準少
+   任一情況都列為回歸，並以結束碼 1 結束
+
+使用方式:
+    python perfPiLib.py [輸出前綴] [基準.json]
+"""
+
+import json
+import sys
+from piLib import DIGIT_SWEEP, measure_all_methods
+
+# 預設輸出前綴
+DEFAULT_PREFIX = 'pi_benchmark'
+
+# 每個組合重複計時的次數
+REPEATS = 3
+
+# 最小時間超過基準的這個倍數時視為回歸
+REGRESSION_RATIO = 1.25
+
+
+def compare(rows, baseline):
+    """
+    與基準結果比較
+
+    Args:
+        rows: 本次的結果
+        baseline: 基準結果
+
+    Returns:
+        list: 回歸說明字串的列表
+    """
+    previous = {(row['method'], row['target_digits']): row for row in baseline}
+    regressions = []
+    for row in rows:
+        old = previous.get((row['method'], row['target_digits']))
+        if old is None:
+            continue
+        label = f"{row['method']} @ {row['target_digits']:,} 位"
+        ratio = row['time_min'] / old['time_min'] if old['time_min'] else 1.0
+        if ratio > REGRESSION_RATIO:
+            regressions.append(f'{label}: 時間為基準的 {ratio:.2f} 倍')
+        if row['correct_digits'] < old['correct_digits']:
+            regressions.append(f"{label}: 正確位數 {old['correct_digits']:,} -> "
+                               f"{row['correct_digits']:,}")
+    return regressions
+
+
+def main():
+    """
+    主函數，執行掃描、寫出結果並與基準比較
+    """
+    prefix = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_PREFIX
+    rows = measure_all_methods(DIGIT_SWEEP, repeats=REPEATS,
+                               csv_path=f'{prefix}.csv', json_path=f'{prefix}.json')
+    print(f'\n結果已寫入 {prefix}.csv 與 {prefix}.json')
+
+    if len(sys.argv) > 2:
+        with open(sys.argv[2], 'r', encoding='utf-8') as f:
+            regressions = compare(rows, json.load(f))
+        if regressions:
+            print('\n發現效能回歸:')
+            for message in regressions:
+                print(f'===> {message}')
+            sys.exit(1)
+        print('\n沒有發現效能回歸')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+比較 primeLib.is_prime_many 各後端與逐一呼叫 is_prime 的速度
+
+這個程式會:
+1. 產生三種工作量：
+   - 稠密: 0 到 10^6 之間的所有整數
+   - 稀疏 32 位元: 200,000 個小於 2^32 的隨機整數（向量化 Miller–Rabin）
+   - 稀疏 64 位元: 200,000 個介於 2^40 與 2^63 之間的隨機整數
+2. 以 Python 迴圈逐一呼叫 is_prime 作為基準
+3. 分別以 'sieve'、'numpy'、'pool' 後端執行 is_prime_many，
+   確認結果與基準相同，並列印執行時間與加速倍數
+
+備註:
+'sieve' 後端需要篩到最大值，只適用於稠密的工作量；
+'pool' 後端的加速取決於 CPU 數量
+"""
+
+import os
+import time
+import numpy as np
+from primeLib import is_prime, is_prime_many
+
+# 稠密工作量的上限
+DENSE_LIMIT = 1_000_000
+
+# 稀疏工作量的數字個數
+SPARSE_COUNT = 200_000
+
+
+def timed(func, *args, **kwargs):
+    """
+    執行函數並計時
+
+    Args:
+        func: 要執行的函數
+
+    Returns:
+        tuple: (回傳值, 執行秒數)
+    """
+    start_time = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start_time
+
+
+def run(name, values, backends):
+    """
+    以基準迴圈與指定後端檢測同一批數字，列印比較結果
+
+    Args:
+        name: 工作量名稱
+        values: NumPy 整數陣列
+        backends: 要比較的 is_prime_many 後端
+    """
+    print(f'\n=== {name}: {values.size:,} 個數字，最大值 {int(values.max()):,} ===')
+    expected, baseline = timed(lambda: [is_prime(n) for n in values.tolist()])
+    print(f'===>{"迴圈":>8}: {baseline:8.3f} 秒')
+    for backend in backends:
+        result, elapsed = timed(is_prime_many, values, backend=backend)
+        assert result.tolist() == expected, backend
+        print(f'===>{backend:>8}: {elapsed:8.3f} 秒 ({baseline / elapsed:6.1f}x)')
+
+
+def main():
+    """
+    主函數，執行稠密與兩種稀疏工作量
+    """
+    print(f'CPU 數量: {os.cpu_count()}')
+    run('稠密', np.arange(DENSE_LIMIT), ('sieve', 'numpy', 'pool'))
+    rng = np.random.default_rng(2025)
+    sparse = rng.integers(2**20, 2**32, size=SPARSE_COUNT, dtype=np.int64)
+    run('稀疏 32 位元', sparse, ('numpy', 'pool'))
+    sparse = rng.integers(2**40, 2**63, size=SPARSE_COUNT, dtype=np.int64)
+    run('稀疏 64 位元', sparse, ('numpy', 'pool'))
+
+
+if __name__ == "__main__":
+    main()
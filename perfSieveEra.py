@@ -0,0 +1,55 @@
+"""
+比較 sieveEra 的增量篩法與逐一試除的質數生成速度
+
+這個程式會:
+1. 以 10^6 與 10^7 為上限
+2. 以 eratosthenes（對每個奇數呼叫 is_prime，即改版前 primes_list /
+   primes_set / primes_gen 使用的做法）作為基準
+3. 分別執行 primes_list、primes_set、primes_gen 與不設上限的 take，
+   確認結果與基準相同，並列印執行時間與加速倍數
+"""
+
+import time
+from sieveEra import eratosthenes, primes_gen, primes_list, primes_set, take
+
+# 測試的上限值
+LIMITS = (10**6, 10**7)
+
+
+def timed(func, *args):
+    """
+    執行函數並計時
+
+    Args:
+        func: 要執行的函數
+
+    Returns:
+        tuple: (回傳值, 執行秒數)
+    """
+    start_time = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start_time
+
+
+def main():
+    """
+    主函數，對每個上限值列印比較表
+    """
+    for limit in LIMITS:
+        expected, baseline = timed(eratosthenes, limit)
+        print(f'\n=== 上限 {limit:,}: {len(expected):,} 個質數 ===')
+        print(f'===>{"eratosthenes (試除)":>22}: {baseline:8.3f} 秒')
+        candidates = {
+            'primes_list': lambda: primes_list(limit),
+            'primes_set': lambda: sorted(primes_set(limit)),
+            'primes_gen': lambda: list(primes_gen(limit)),
+            'take (不設上限)': lambda: take(len(expected)),
+        }
+        for name, func in candidates.items():
+            result, elapsed = timed(func)
+            assert result == expected, name
+            print(f'===>{name:>22}: {elapsed:8.3f} 秒 ({baseline / elapsed:6.1f}x)')
+
+
+if __name__ == "__main__":
+    main()
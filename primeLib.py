@@ -4,26 +4,222 @@ primeLib.py - 質數相關函數庫
 此模組提供多種質數相關的函數，包括質數生成和質數檢測功能。
 
 主要功能：
-1. generate_primes: 使用埃拉托斯特尼篩法生成前 n 個質數
-2. is_prime_v1: 最簡單的 O(n) 質數檢測演算法
-3. is_prime_v2: 使用平方根優化的 O(√n) 質數檢測
-4. is_prime: 綜合多種優化策略的質數檢測（6k±1、奇數跳躍）
-5. main: 示範與效能測試函數
+1. generate_primes: 使用分段篩法生成前 n 個質數
+2. primes_range: 逐一產生 [lo, hi) 範圍內質數的生成器（分段、只篩奇數、
+   以 bytearray 儲存、預先套用 3~13 的輪 (wheel) 樣板），
+   記憶體約為 √hi 加上一個快取大小的分段
+3. is_prime_v1: 最簡單的 O(n) 質數檢測演算法
+4. is_prime_v2: 使用平方根優化的 O(√n) 質數檢測
+5. is_prime: 小數字使用 6k±1 試除法；較大的數字先以小質數試除，
+   n < 2^64 時使用固定基底的確定性 Miller–Rabin，
+   更大的整數使用 Baillie–PSW (BPSW) 檢測
+6. is_prime_many: 批次檢測，回傳 NumPy 布林陣列；稠密輸入直接篩到最大值，
+   稀疏輸入先以 NumPy 向量化試除小質數，剩下的再做 Miller–Rabin
+   （數量多時分段交給 ProcessPoolExecutor）
+7. benchmark_cutover: 測量試除法與 Miller–Rabin 的交叉點
+8. PrimeTable / use_prime_table: 存在磁碟上、以 mmap 讀取的質數位元表，
+   is_prime 在表內為 O(1) 查表，prime_pi / nth_prime 使用區塊索引，
+   需要更大的範圍時只篩新增的部分
+9. prime_pi: 質數計數函數 π(x)，以 NumPy 向量化的 Lucy_Hedgehog 演算法計算，
+   不需要列出 x 以內的質數
+10. nth_prime: 以 Cipolla 漸近式估計第 n 個質數，再以 prime_pi 與分段篩法修正
+11. main: 示範與效能測試函數
 
 使用方式：
 - 直接執行模組：python primeLib.py
 - 匯入特定函數：from primeLib import generate_primes, is_prime
 """
 
-from typing import List
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Union
+from itertools import compress, islice
 import math
+import mmap
+import os
+import struct
+import tempfile
 import time
+import numpy as np
+try:
+    import fcntl        # 檔案鎖，只有 Unix 平台提供
+except ImportError:
+    fcntl = None
+
+# 每個分段涵蓋的奇數個數（每個奇數 1 個位元組），約等於 L2 快取大小
+SEGMENT_SIZE = 1 << 18
+
+# 輪 (wheel) 樣板預先排除的小質數
+WHEEL_PRIMES = (3, 5, 7, 11, 13)
+
+# 小於這個值時 6k±1 試除法比 Miller–Rabin 快（由 benchmark_cutover 測得）
+TRIAL_DIVISION_CUTOFF = 50_000
+
+# 確定性 Miller–Rabin 的基底：n 小於上限時，只用對應的基底就不會誤判；
+# 最後一組（前 12 個質數）涵蓋所有 64 位元整數
+MR_BASES_64 = (
+    (2_047, (2,)),
+    (1_373_653, (2, 3)),
+    (25_326_001, (2, 3, 5)),
+    (3_215_031_751, (2, 3, 5, 7)),
+    (2_152_302_898_747, (2, 3, 5, 7, 11)),
+    (3_474_749_660_383, (2, 3, 5, 7, 11, 13)),
+    (341_550_071_728_321, (2, 3, 5, 7, 11, 13, 17)),
+    (3_825_123_056_546_413_051, (2, 3, 5, 7, 11, 13, 17, 19, 23)),
+    (1 << 64, (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37)),
+)
+
+# Miller–Rabin 之前先試除的小質數
+_SMALL_PRIMES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47)
+
+# is_prime_many: NumPy 向量化試除使用小於這個值的質數
+PREFILTER_LIMIT = 256
+
+# is_prime_many: n < 2^32 時以 uint64 向量化 Miller–Rabin（乘積不會溢位），
+# 基底 2, 7, 61 對 n < 4,759,123,141 是確定性的
+MR_BASES_32 = (2, 7, 61)
+
+# is_prime_many: 最大值不超過「輸入個數 × DENSE_RATIO」時視為稠密輸入，直接篩到最大值
+DENSE_RATIO = 64
+
+# is_prime_many: 篩法後端的上限（每個數字佔 1 個位元組）
+SIEVE_MAX = 1 << 27
+
+# is_prime_many: 需要 Miller–Rabin 的數字達到這個數量，且有多個 CPU 時才使用 process pool
+POOL_MIN_SIZE = 50_000
+
+# is_prime_many: 每個 process pool 工作的數字個數
+POOL_CHUNK_SIZE = 10_000
+
+# PrimeTable 的預設檔案位置（可用環境變數 PRIME_TABLE_PATH 指定）
+PRIME_TABLE_PATH = Path(os.environ.get('PRIME_TABLE_PATH',
+                                       Path(tempfile.gettempdir()) / 'primeLib_table.bits'))
+
+# PrimeTable 索引區塊的位元組數：每個位元組代表 8 個奇數，即 16 個整數
+TABLE_BLOCK_BYTES = 4096
+
+# 目前使用中的質數表（由 use_prime_table 設定），is_prime 會先查表
+_TABLE = None
+
+
+def _wheel_pattern() -> bytearray:
+    """
+    建立輪樣板：第 k 個位置代表奇數 2k+1，
+    不能被 WHEEL_PRIMES 整除時為 1，週期為 3*5*7*11*13 個奇數
+    """
+    period = math.prod(WHEEL_PRIMES)
+    pattern = bytearray([1]) * period
+    for p in WHEEL_PRIMES:
+        # 奇數 2k+1 是 p 的倍數 <=> k ≡ (p-1)/2 (mod p)
+        pattern[(p - 1) // 2::p] = bytes(len(range((p - 1) // 2, period, p)))
+    return pattern
+
+
+_WHEEL = _wheel_pattern()
+
+
+def _odd_primes_up_to(limit: int) -> List[int]:
+    """
+    以只篩奇數的 bytearray 篩法回傳 3 到 limit（含）之間的質數
+
+    Args:
+        limit (int): 上限值
+
+    Returns:
+        list: 奇質數列表
+    """
+    if limit < 3:
+        return []
+    size = (limit - 1) // 2         # 位置 k 代表奇數 2k+1，k = 1..size
+    sieve = bytearray([1]) * (size + 1)
+    sieve[0] = 0                    # 1 不是質數
+    for k in range(1, (math.isqrt(limit) - 1) // 2 + 1):
+        if sieve[k]:
+            p = 2 * k + 1
+            start = (p * p - 1) // 2
+            sieve[start::p] = bytes(len(range(start, size + 1, p)))
+    return list(compress(range(1, limit + 1, 2), sieve))
+
+
+def _sieve_segments(lo: int, hi: int, segment_size: int = SEGMENT_SIZE) -> Iterator[tuple]:
+    """
+    逐段篩出 [lo, hi) 範圍內的奇質數
+
+    每個分段是一個 bytearray，seg[i] 為 1 表示 seg_lo + 2i 是質數；
+    WHEEL_PRIMES 本身也被輪樣板排除，呼叫端需要自行補上
+
+    Args:
+        lo (int): 下限（含）
+        hi (int): 上限（不含）
+        segment_size (int): 每個分段涵蓋的奇數個數
+
+    Yields:
+        tuple: (seg_lo, seg)，seg_lo 為分段的第一個奇數
+    """
+    base_primes = [p for p in _odd_primes_up_to(math.isqrt(hi - 1))
+                   if p > WHEEL_PRIMES[-1]]
+    period = len(_WHEEL)
+    tiled = _WHEEL * (segment_size // period + 2)
+    zeros = memoryview(bytes(segment_size))
+
+    seg_lo = max(lo, 1) | 1         # 分段起點一律是奇數
+    while seg_lo < hi:
+        seg_hi = min(seg_lo + 2 * segment_size, hi)
+        size = (seg_hi - seg_lo + 1) // 2
+        offset = (seg_lo // 2) % period
+        seg = tiled[offset:offset + size]
+        if seg_lo == 1:
+            seg[0] = 0              # 1 不是質數
+
+        for p in base_primes:
+            start = p * p
+            if start >= seg_hi:
+                break
+            if start < seg_lo:
+                start = (seg_lo + p - 1) // p * p
+                if start % 2 == 0:
+                    start += p
+            i = (start - seg_lo) // 2
+            seg[i::p] = zeros[:(size - 1 - i) // p + 1]
+
+        yield seg_lo, seg
+        seg_lo = seg_hi if seg_hi % 2 else seg_hi + 1
+
+
+def primes_range(lo: int, hi: int, segment_size: int = SEGMENT_SIZE) -> Iterator[int]:
+    """
+    逐一產生 [lo, hi) 範圍內的質數
+
+    使用分段的埃拉托斯特尼篩法：
+    - 只篩奇數，每個奇數佔 1 個位元組 (bytearray)
+    - 每個分段先複製輪樣板，已排除 3, 5, 7, 11, 13 的倍數
+    - 只需要保存 √hi 以內的基底質數與一個分段
+
+    Args:
+        lo (int): 下限（含）
+        hi (int): 上限（不含）
+        segment_size (int): 每個分段涵蓋的奇數個數
+
+    Yields:
+        int: 範圍內的質數，由小到大
+    """
+    if hi <= 2 or lo >= hi:
+        return
+    if lo <= 2:
+        yield 2
+    for p in WHEEL_PRIMES:
+        if lo <= p < hi:
+            yield p
+    for seg_lo, seg in _sieve_segments(lo, hi, segment_size):
+        yield from compress(range(seg_lo, seg_lo + 2 * len(seg), 2), seg)
+
 
 def generate_primes(n: int) -> List[int]:
     """
     生成前 n 個質數
     
-    使用埃拉托斯特尼篩法 (Sieve of Eratosthenes) 生成質數列表
+    使用分段的埃拉托斯特尼篩法 (primes_range) 生成質數列表
     
     Args:
         n (int): 需要生成的質數數量
@@ -31,23 +227,22 @@ def generate_primes(n: int) -> List[int]:
     Returns:
         list: 包含前 n 個質數的列表
     """
-    # 根據質數定理估算篩選範圍
-    if n < 6:
-        sieve_size = 15
-    else:
-        sieve_size = int(n * (math.log(n) + math.log(math.log(n)))) + 3
-    sieve = [True] * sieve_size
-    sieve[0:2] = [False, False]  # 0 和 1 不是質數
+    return list(islice(primes_range(2, _nth_prime_upper_bound(n)), n))
 
-    limit = int(math.sqrt(sieve_size)) + 1
-    for current_prime in range(2, limit):
-        if sieve[current_prime]:
-            # 將當前質數的所有倍數標記為合數
-            for multiple in range(current_prime ** 2, sieve_size, current_prime):
-                sieve[multiple] = False
 
-    primes = [num for num, is_prime in enumerate(sieve) if is_prime]
-    return primes[:n]
+def _nth_prime_upper_bound(n: int) -> int:
+    """
+    根據質數定理估算篩選範圍：第 n 個質數小於回傳值
+
+    Args:
+        n (int): 質數的序號
+
+    Returns:
+        int: 篩選範圍的上限（不含）
+    """
+    if n < 6:
+        return 15
+    return int(n * (math.log(n) + math.log(math.log(n)))) + 3
 
 def is_prime_v1(n: int) -> bool:
     """
@@ -94,6 +289,60 @@ def is_prime(n: int) -> bool:
     """
     檢查數字是否為質數 (最優化版本)
     
+    依數字大小選擇演算法：
+    - 已用 use_prime_table 載入質數表且 n 在表內: O(1) 查表
+    - n < TRIAL_DIVISION_CUTOFF: 6k±1 試除法 (is_prime_trial)
+    - n < 2^64: 小質數試除後，做確定性 Miller–Rabin (is_prime_mr)
+    - 更大的整數: Baillie–PSW（以 2 為基底的 Miller–Rabin + 強 Lucas 檢測），
+      目前沒有已知的反例
+    
+    Args:
+        n (int): 需要檢查的數字
+    
+    Returns:
+        bool: 如果 n 是質數則返回 True，否則返回 False
+    """
+    if _TABLE is not None and 0 <= n < _TABLE.limit:
+        return _TABLE.is_prime(n)
+    if n < TRIAL_DIVISION_CUTOFF:
+        return is_prime_trial(n)
+    for p in _SMALL_PRIMES:
+        if n % p == 0:
+            return False
+    if n < 1 << 64:
+        return is_prime_mr(n)
+    return _is_strong_probable_prime(n, 2) and _is_strong_lucas_probable_prime(n)
+
+
+def is_prime_mr(n: int) -> bool:
+    """
+    檢查數字是否為質數 (確定性 Miller–Rabin，n < 2^64)
+
+    依 n 的大小從 MR_BASES_64 選出最少的基底
+
+    Args:
+        n (int): 需要檢查的數字，必須小於 2^64
+
+    Returns:
+        bool: 如果 n 是質數則返回 True，否則返回 False
+
+    Raises:
+        ValueError: 如果 n 大於或等於 2^64
+    """
+    if n < 2:
+        return False
+    if n % 2 == 0:
+        return n == 2
+    for limit, bases in MR_BASES_64:
+        if n < limit:
+            return all(_is_strong_probable_prime(n, a) for a in bases)
+    raise ValueError("is_prime_mr 只適用於 n < 2^64")
+
+
+def is_prime_trial(n: int) -> bool:
+    """
+    檢查數字是否為質數 (6k±1 試除法)
+    
     使用多種優化策略的質數檢查函數，包括：
     - 奇數優化
     - 6k±1 優化
@@ -105,7 +354,7 @@ def is_prime(n: int) -> bool:
     Returns:
         bool: 如果 n 是質數則返回 True，否則返回 False
     """
-    if n == 1:
+    if n < 2:
         return False
     if n < 4:  # 2 和 3 是質數
         return True
@@ -114,13 +363,684 @@ def is_prime(n: int) -> bool:
     if n < 9:  # 4, 6, 8 已經排除，5 和 7 是質數
         return True
     
-    max_divisor = math.floor(math.sqrt(n))
+    max_divisor = math.isqrt(n)
     for d in range(5, 1 + max_divisor, 6):  # 6k±1 優化
         if n % d == 0 or n % (d + 2) == 0:
             return False
     return True
 
 
+def _is_strong_probable_prime(n: int, a: int) -> bool:
+    """
+    以 a 為基底的強可能質數 (Miller–Rabin) 檢測，n 必須是大於 2 的奇數
+
+    Args:
+        n (int): 需要檢查的數字
+        a (int): 基底
+
+    Returns:
+        bool: n 通過檢測時返回 True
+    """
+    a %= n
+    if a == 0:
+        return True
+    d = n - 1
+    s = (d & -d).bit_length() - 1     # n - 1 = d * 2^s，d 為奇數
+    d >>= s
+    x = pow(a, d, n)
+    if x == 1 or x == n - 1:
+        return True
+    for _ in range(s - 1):
+        x = x * x % n
+        if x == n - 1:
+            return True
+    return False
+
+
+def _jacobi(a: int, n: int) -> int:
+    """
+    計算 Jacobi 符號 (a/n)，n 必須是正奇數
+    """
+    a %= n
+    result = 1
+    while a:
+        while a % 2 == 0:
+            a //= 2
+            if n % 8 in (3, 5):
+                result = -result
+        a, n = n, a
+        if a % 4 == 3 and n % 4 == 3:
+            result = -result
+        a %= n
+    return result if n == 1 else 0
+
+
+def _is_strong_lucas_probable_prime(n: int) -> bool:
+    """
+    強 Lucas 可能質數檢測（Selfridge 方法 A 選擇參數）
+
+    選出第一個使 Jacobi(D/n) = -1 的 D = 5, -7, 9, -11, ...，
+    取 P = 1, Q = (1 - D) / 4；n 必須是大於 2 的奇數
+
+    Args:
+        n (int): 需要檢查的數字
+
+    Returns:
+        bool: n 通過檢測時返回 True
+    """
+    if math.isqrt(n) ** 2 == n:
+        return False    # 完全平方數找不到合適的 D
+    D = 5
+    while True:
+        j = _jacobi(D, n)
+        if j == -1:
+            break
+        if j == 0 and abs(D) != n:
+            return False
+        D = -D - 2 if D > 0 else -D + 2
+    P, Q = 1, (1 - D) // 4
+
+    d = n + 1
+    s = (d & -d).bit_length() - 1     # n + 1 = d * 2^s，d 為奇數
+    d >>= s
+
+    # 由高位元到低位元計算 U_d, V_d (mod n)
+    U, V, Qk = 1, P, Q % n
+    inv2 = (n + 1) // 2
+    for bit in bin(d)[3:]:
+        U, V = U * V % n, (V * V - 2 * Qk) % n
+        Qk = Qk * Qk % n
+        if bit == '1':
+            U, V = (P * U + V) * inv2 % n, (D * U + P * V) * inv2 % n
+            Qk = Qk * Q % n
+    if U == 0 or V == 0:
+        return True
+    for _ in range(s - 1):
+        V = (V * V - 2 * Qk) % n
+        if V == 0:
+            return True
+        Qk = Qk * Qk % n
+    return False
+
+
+def _prime_mask(limit: int) -> np.ndarray:
+    """
+    以 NumPy 篩法建立 0 到 limit（含）的質數遮罩
+
+    Args:
+        limit (int): 上限值
+
+    Returns:
+        np.ndarray: 布林陣列，mask[n] 表示 n 是否為質數
+    """
+    mask = np.ones(limit + 1, dtype=bool)
+    mask[:2] = False
+    mask[4::2] = False
+    for p in range(3, math.isqrt(limit) + 1, 2):
+        if mask[p]:
+            mask[p * p::2 * p] = False
+    return mask
+
+
+_PREFILTER_PRIMES = [2] + _odd_primes_up_to(PREFILTER_LIMIT - 1)
+
+
+def _is_prime_u32(n: np.ndarray) -> np.ndarray:
+    """
+    向量化的確定性 Miller–Rabin，n 必須是 PREFILTER_LIMIT 到 2^32 之間、
+    且不含小因數的奇數（uint64 陣列）
+
+    Args:
+        n (np.ndarray): uint64 陣列
+
+    Returns:
+        np.ndarray: 布林陣列
+    """
+    one = np.uint64(1)
+    n_minus_1 = n - one
+    d = n_minus_1.copy()
+    s = np.zeros(n.size, dtype=np.int64)      # n - 1 = d * 2^s，d 為奇數
+    even = (d & one) == 0
+    while even.any():
+        d[even] >>= one
+        s[even] += 1
+        even = (d & one) == 0
+
+    result = np.ones(n.size, dtype=bool)
+    for a in MR_BASES_32:
+        # 由高位元到低位元計算 x = a^d mod n
+        x = np.ones(n.size, dtype=np.uint64)
+        base = np.uint64(a) % n
+        for bit in range(31, -1, -1):
+            x = x * x % n
+            odd = ((d >> np.uint64(bit)) & one) == 1
+            x = np.where(odd, x * base % n, x)
+        passed = (x == one) | (x == n_minus_1)
+        for r in range(1, 32):
+            x = x * x % n
+            passed |= (x == n_minus_1) & (r < s)
+        result &= passed
+    return result
+
+
+def _is_prime_chunk(chunk: List[int]) -> List[bool]:
+    """
+    process pool 的工作函數：逐一檢測一段數字
+    """
+    return [is_prime(n) for n in chunk]
+
+
+def _as_int_array(values: Union[Iterable[int], np.ndarray]) -> np.ndarray:
+    """
+    把輸入轉成整數陣列
+
+    依輸入的最小值與最大值選擇 dtype，不使用 NumPy 推斷的型別
+    （混合 ≥ 2^63 與小整數時 NumPy 會推斷成 float64）:
+    - 都在 int64 範圍內: int64
+    - 都是 0 ≤ n < 2^64: uint64
+    - 其餘: object，保留 Python 整數
+
+    Raises:
+        TypeError: 如果輸入不是整數
+    """
+    if isinstance(values, np.ndarray):
+        arr = values
+    else:
+        values = list(values)
+        if any(isinstance(v, bool) or not isinstance(v, (int, np.integer)) for v in values):
+            raise TypeError("輸入必須為整數")
+        values = [int(v) for v in values]
+        lo, hi = (min(values), max(values)) if values else (0, 0)
+        if lo >= -(1 << 63) and hi < 1 << 63:
+            dtype = np.int64
+        elif lo >= 0 and hi < 1 << 64:
+            dtype = np.uint64
+        else:
+            dtype = object
+        arr = np.array(values, dtype=dtype)
+    if arr.dtype.kind not in 'iuO':
+        raise TypeError("輸入必須為整數")
+    return arr
+
+
+def is_prime_many(values: Union[Iterable[int], np.ndarray], backend: str = 'auto',
+                  workers: Optional[int] = None) -> np.ndarray:
+    """
+    批次檢查多個數字是否為質數
+
+    後端:
+    - 'sieve': 以 NumPy 篩到最大值後查表，適合稠密的輸入（例如 range(10**6)）
+    - 'numpy': 以 NumPy 向量化試除 PREFILTER_LIMIT 以下的質數；
+      小於 2^32 的數字以向量化 Miller–Rabin 判斷，其餘逐一做 Miller–Rabin / BPSW
+    - 'pool': 同 'numpy'，但剩下的數字分段交給 ProcessPoolExecutor
+    - 'auto': 最大值 ≤ SIEVE_MAX 且 ≤ 輸入個數 × DENSE_RATIO 時用 'sieve'，
+      否則用試除預篩；剩下的數字不少於 POOL_MIN_SIZE 且有多個 CPU 時才開 pool
+
+    Args:
+        values: 整數的可迭代物件或 NumPy 整數陣列
+        backend (str): 'auto', 'sieve', 'numpy' 或 'pool'
+        workers (int, optional): process pool 的行程數，預設為 CPU 數量
+
+    Returns:
+        np.ndarray: 與輸入形狀相同的布林陣列
+
+    Raises:
+        TypeError: 如果輸入不是整數
+        ValueError: 如果後端名稱不正確，或超過 64 位元的整數使用 'sieve'
+    """
+    arr = _as_int_array(values)
+    flat = arr.ravel()
+    if backend not in ('auto', 'sieve', 'numpy', 'pool'):
+        raise ValueError(f"未知的後端: {backend}")
+    if flat.size == 0:
+        return np.zeros(arr.shape, dtype=bool)
+
+    if backend == 'auto' and flat.dtype != object:
+        top = int(flat.max())
+        if top <= SIEVE_MAX and top <= DENSE_RATIO * flat.size:
+            backend = 'sieve'
+
+    result = np.zeros(flat.size, dtype=bool)
+    if backend == 'sieve':
+        if flat.dtype == object:
+            raise ValueError("sieve 後端只接受 64 位元以內的整數")
+        valid = flat >= 0
+        mask = _prime_mask(max(int(flat.max()), 1))
+        result[valid] = mask[flat[valid]]
+        return result.reshape(arr.shape)
+
+    if flat.dtype == object:
+        idx = np.flatnonzero(flat >= 2)
+    else:
+        idx = np.flatnonzero(flat >= 2)
+        vals = flat[idx]
+        for p in _PREFILTER_PRIMES:
+            # 每除完一個質數就壓縮陣列，後面的質數只需要處理剩下的數字
+            keep = (vals % p != 0) | (vals == p)
+            idx, vals = idx[keep], vals[keep]
+        # 通過試除且小於 PREFILTER_LIMIT² 的數字一定是質數
+        small = vals < PREFILTER_LIMIT ** 2
+        result[idx[small]] = True
+        # 小於 2^32 的數字直接以 uint64 向量化 Miller–Rabin 判斷
+        u32 = ~small & (vals < 1 << 32)
+        result[idx[u32]] = _is_prime_u32(vals[u32].astype(np.uint64))
+        idx = idx[~small & ~u32]
+
+    candidates = flat[idx].tolist()
+    if backend == 'auto':
+        use_pool = len(candidates) >= POOL_MIN_SIZE and (os.cpu_count() or 1) > 1
+    else:
+        use_pool = backend == 'pool'
+    if use_pool:
+        chunks = [candidates[i:i + POOL_CHUNK_SIZE]
+                  for i in range(0, len(candidates), POOL_CHUNK_SIZE)]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            flags = [flag for chunk in executor.map(_is_prime_chunk, chunks) for flag in chunk]
+    else:
+        flags = _is_prime_chunk(candidates)
+    result[idx] = flags
+    return result.reshape(arr.shape)
+
+
+@contextmanager
+def _file_lock(f):
+    """
+    以 fcntl.flock 取得檔案的獨占鎖，讓多個行程輪流修改同一個檔案
+    （沒有 fcntl 的平台上不上鎖）
+    """
+    if fcntl is None:
+        yield
+        return
+    fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+    try:
+        yield
+    finally:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+class PrimeTable:
+    """
+    存在磁碟上、以 mmap 讀取的質數位元表
+
+    檔案格式:
+    - 表頭 16 位元組: 魔術字 b'PRIMTBL1' 與涵蓋範圍 limit (uint64, little-endian)
+    - 位元表: 第 k 個位元（每個位元組由低位元開始）代表奇數 2k+1 是否為質數，
+      每個位元組涵蓋 16 個整數
+    - 索引另存於同名的 .idx 檔: 表頭 b'PRIMIDX1' 與索引對應的 limit，
+      之後每 TABLE_BLOCK_BYTES 個位元組一筆，記錄該區塊之前的奇質數個數 (uint64)；
+      遺失、表頭或大小與位元表不一致時由位元表重建
+
+    擴充時只在檔尾附加新的分段，並在寫完位元表後才更新表頭的 limit，
+    中途中斷的擴充會在下次開啟時被截掉。
+    開啟、截斷與擴充都在位元表檔案的 fcntl.flock 獨占鎖內進行，
+    多個行程可以共用同一個檔案；擴充前重新讀取表頭，接續其他行程已經篩好的範圍
+
+    Args:
+        path: 位元表檔案路徑，預設為 PRIME_TABLE_PATH
+        limit (int): 至少要涵蓋 [0, limit) 的範圍
+    """
+
+    _MAGIC = b'PRIMTBL1'
+    _INDEX_MAGIC = b'PRIMIDX1'
+    _HEADER = struct.Struct('<8sQ')
+
+    def __init__(self, path=None, limit=0):
+        self.path = Path(path or PRIME_TABLE_PATH)
+        self._index_path = self.path.with_suffix('.idx')
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = os.fdopen(os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644), 'r+b')
+        self._mm = None
+        try:
+            with _file_lock(self._file):
+                size = os.fstat(self._file.fileno()).st_size
+                if size == 0:
+                    self._file.write(self._HEADER.pack(self._MAGIC, 0))
+                    self._file.flush()
+                    size = self._HEADER.size
+                self._read_header(size)
+                # 截掉中斷的擴充留下、表頭之外的資料
+                self._file.truncate(self._HEADER.size + self.limit // 16)
+                self._map()
+                self._load_index()
+        except BaseException:
+            self.close()
+            raise
+        if limit > self.limit:
+            self.extend(limit)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({str(self.path)!r}, limit={self.limit:,})'
+
+    def _read_header(self, size):
+        """
+        讀取並檢查表頭，設定 self.limit
+
+        Raises:
+            ValueError: 如果魔術字不對、limit 不是區塊大小的倍數，
+                或檔案比表頭記錄的範圍還短
+        """
+        self._file.seek(0)
+        header = self._file.read(self._HEADER.size)
+        if len(header) < self._HEADER.size:
+            raise ValueError(f"{self.path} 不是質數表檔案")
+        magic, limit = self._HEADER.unpack(header)
+        if (magic != self._MAGIC or limit % (16 * TABLE_BLOCK_BYTES) or
+                size < self._HEADER.size + limit // 16):
+            raise ValueError(f"{self.path} 不是質數表檔案或已損毀")
+        self.limit = limit
+
+    def _map(self):
+        self._mm = mmap.mmap(self._file.fileno(), 0)
+        self._bits = np.frombuffer(self._mm, dtype=np.uint8, offset=self._HEADER.size)
+
+    def _unmap(self):
+        del self._bits      # numpy 的檢視必須先釋放，mmap 才能關閉
+        self._mm.close()
+        self._mm = None
+
+    def _load_index(self):
+        """
+        讀取 .idx 檔；表頭的 limit 與大小都符合位元表時才使用，否則重建
+        """
+        n_blocks = self.limit // 16 // TABLE_BLOCK_BYTES
+        if self._index_path.exists():
+            data = self._index_path.read_bytes()
+            if len(data) == self._HEADER.size + 8 * (n_blocks + 1):
+                magic, limit = self._HEADER.unpack_from(data)
+                if magic == self._INDEX_MAGIC and limit == self.limit:
+                    self._index = np.frombuffer(data, dtype='<u8', offset=self._HEADER.size)
+                    return
+        counts = np.bitwise_count(self._bits.reshape(n_blocks, TABLE_BLOCK_BYTES)).sum(axis=1)
+        self._index = np.concatenate(([0], np.cumsum(counts, dtype=np.uint64))).astype('<u8')
+        self._save_index()
+
+    def _save_index(self):
+        """
+        寫出 .idx 檔（先寫暫存檔再取代）
+        """
+        tmp_path = f'{self._index_path}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(self._HEADER.pack(self._INDEX_MAGIC, self.limit))
+            f.write(self._index.tobytes())
+        os.replace(tmp_path, self._index_path)
+
+    def extend(self, limit):
+        """
+        把質數表擴充到至少涵蓋 [0, limit)，只篩新增的範圍
+
+        Args:
+            limit (int): 新的範圍上限，會向上取整到區塊大小
+        """
+        span = 16 * TABLE_BLOCK_BYTES
+        limit = -(-limit // span) * span
+        if limit <= self.limit:
+            return
+        with _file_lock(self._file):
+            # 其他行程可能已經擴充，以檔案上的表頭為準
+            self._unmap()
+            self._read_header(os.fstat(self._file.fileno()).st_size)
+            self._map()
+            if self._index.size != self.limit // 16 // TABLE_BLOCK_BYTES + 1:
+                self._load_index()
+            if limit > self.limit:
+                self._append(limit)
+                self._unmap()
+                self._map()
+
+    def _append(self, limit):
+        """
+        在檔案鎖內篩出 [self.limit, limit) 並附加到檔尾，最後才更新表頭
+        """
+        old_limit = self.limit
+        counts = []
+        self._file.seek(self._HEADER.size + old_limit // 16)
+        # SEGMENT_SIZE 是 8 * TABLE_BLOCK_BYTES 的倍數，每個分段都剛好是整數個區塊
+        for seg_lo, seg in _sieve_segments(old_limit + 1, limit, SEGMENT_SIZE):
+            packed = np.packbits(np.frombuffer(seg, dtype=np.uint8), bitorder='little')
+            if seg_lo == 1:
+                for p in WHEEL_PRIMES:
+                    packed[p >> 4] |= 1 << ((p >> 1) & 7)
+            self._file.write(packed.tobytes())
+            counts.append(np.bitwise_count(packed.reshape(-1, TABLE_BLOCK_BYTES)).sum(axis=1))
+        self._file.flush()
+        self._file.seek(0)
+        self._file.write(self._HEADER.pack(self._MAGIC, limit))
+        self._file.flush()
+
+        self.limit = limit
+        self._index = np.concatenate(
+            (self._index, self._index[-1] + np.cumsum(np.concatenate(counts), dtype=np.uint64))
+        ).astype('<u8')
+        self._save_index()
+
+    def is_prime(self, n):
+        """
+        以位元表檢查 n 是否為質數；超出範圍時改用 primeLib.is_prime
+
+        Args:
+            n (int): 需要檢查的數字
+
+        Returns:
+            bool: 如果 n 是質數則返回 True，否則返回 False
+        """
+        if not 0 <= n < self.limit:
+            return is_prime(n) if n >= self.limit else False
+        if n & 1 == 0:
+            return n == 2
+        return self._mm[self._HEADER.size + (n >> 4)] >> ((n >> 1) & 7) & 1 == 1
+
+    def prime_pi(self, x):
+        """
+        計算不大於 x 的質數個數 π(x)，需要時自動擴充質數表
+
+        Args:
+            x (int): 上限值
+
+        Returns:
+            int: 質數個數
+        """
+        if x < 2:
+            return 0
+        self.extend(x + 1)
+        n_bits = (x + 1) // 2                # 奇數 1, 3, ..., ≤ x 的個數
+        full, rest = divmod(n_bits, 8)
+        block = full // TABLE_BLOCK_BYTES
+        count = int(self._index[block])
+        count += int(np.bitwise_count(self._bits[block * TABLE_BLOCK_BYTES:full]).sum())
+        if rest:
+            count += (int(self._bits[full]) & ((1 << rest) - 1)).bit_count()
+        return count + 1                     # 加上 2
+
+    def nth_prime(self, n):
+        """
+        回傳第 n 個質數（第 1 個質數是 2），需要時自動擴充質數表
+
+        Args:
+            n (int): 質數的序號，從 1 開始
+
+        Returns:
+            int: 第 n 個質數
+
+        Raises:
+            ValueError: 如果 n 小於 1
+        """
+        if n < 1:
+            raise ValueError("n 必須為正整數")
+        if n == 1:
+            return 2
+        target = n - 1                       # 要找第 target 個奇質數
+        if int(self._index[-1]) < target:
+            self.extend(_nth_prime_upper_bound(n))
+        block = int(np.searchsorted(self._index, target, side='left')) - 1
+        start = block * TABLE_BLOCK_BYTES
+        counts = np.cumsum(np.bitwise_count(self._bits[start:start + TABLE_BLOCK_BYTES]))
+        remaining = target - int(self._index[block])
+        byte = int(np.searchsorted(counts, remaining, side='left'))
+        if byte:
+            remaining -= int(counts[byte - 1])
+        value = int(self._bits[start + byte])
+        for bit in range(8):
+            if value >> bit & 1:
+                remaining -= 1
+                if remaining == 0:
+                    return 2 * (8 * (start + byte) + bit) + 1
+
+    def close(self):
+        """
+        關閉 mmap 與檔案
+        """
+        if not self._file.closed:
+            if self._mm is not None:
+                self._unmap()
+            self._file.close()
+
+
+def use_prime_table(limit: int, path=None) -> PrimeTable:
+    """
+    開啟（必要時建立或擴充）磁碟上的質數表，並讓 is_prime 在表內直接查表
+
+    同一個檔案可以被之後的行程重複使用，不需要重新篩
+
+    Args:
+        limit (int): 質數表至少要涵蓋的範圍 [0, limit)
+        path: 位元表檔案路徑，預設為 PRIME_TABLE_PATH
+
+    Returns:
+        PrimeTable: 已載入的質數表
+    """
+    global _TABLE
+    if _TABLE is not None and (path is None or Path(path) == _TABLE.path):
+        _TABLE.extend(limit)
+    else:
+        if _TABLE is not None:
+            _TABLE.close()
+        _TABLE = PrimeTable(path, limit)
+    return _TABLE
+
+
+def _count_primes_range(lo: int, hi: int) -> int:
+    """
+    以分段篩法計算 [lo, hi) 範圍內的質數個數（不產生個別的質數）
+    """
+    if hi <= 2 or lo >= hi:
+        return 0
+    count = (lo <= 2) + sum(lo <= p < hi for p in WHEEL_PRIMES)
+    for _, seg in _sieve_segments(lo, hi):
+        count += seg.count(1)
+    return count
+
+
+def prime_pi(x: int) -> int:
+    """
+    計算不大於 x 的質數個數 π(x)
+
+    使用 Lucy_Hedgehog 演算法：只需要 S(v)（v 以內未被篩掉的數字個數）在
+    v = x // i 這 2√x 個值上的結果，依序以每個質數 p ≤ √x 更新
+    S(v) -= S(v // p) - S(p - 1)。
+    S(v) 分成 small[v] (v ≤ √x) 與 large[i] = S(x // i) 兩個 NumPy 陣列，
+    每個質數的更新都是向量化的，時間約 O(x^(3/4))，記憶體 O(√x)；
+    x 在 use_prime_table 載入的質數表範圍內時直接查表
+
+    Args:
+        x (int): 上限值
+
+    Returns:
+        int: 質數個數
+    """
+    if x < 2:
+        return 0
+    if _TABLE is not None and x < _TABLE.limit:
+        return _TABLE.prime_pi(x)
+    r = math.isqrt(x)
+    idx = np.arange(r + 1, dtype=np.int64)
+    small = idx - 1                                   # small[v] = S(v)
+    large = x // np.maximum(idx, 1) - 1               # large[i] = S(x // i)
+    for p in range(2, r + 1):
+        if small[p] == small[p - 1]:
+            continue                                  # p 不是質數
+        sp = small[p - 1]
+        p2 = p * p
+        # 先更新 large：x // (i·p) 在 i·p ≤ r 時是 large[i·p]，否則是 small[x // (i·p)]
+        lim = min(r, x // p2)
+        k = min(lim, r // p)
+        large[1:k + 1] -= large[p:k * p + 1:p] - sp
+        if lim > k:
+            large[k + 1:lim + 1] -= small[x // (idx[k + 1:lim + 1] * p)] - sp
+        # 再更新 small（右側在指定前已完整計算，讀到的是更新前的值）
+        if p2 <= r:
+            small[p2:] -= small[idx[p2:] // p] - sp
+    return int(large[1])
+
+
+def nth_prime(n: int) -> int:
+    """
+    回傳第 n 個質數（第 1 個質數是 2）
+
+    先以 Cipolla 漸近式估計 x ≈ p_n，計算 π(x) 後再以分段篩法修正：
+    π(x) < n 時往上篩到 _nth_prime_upper_bound(n)，
+    否則往下逐窗計數，直到包含第 n 個質數的視窗
+
+    Args:
+        n (int): 質數的序號，從 1 開始
+
+    Returns:
+        int: 第 n 個質數
+
+    Raises:
+        ValueError: 如果 n 小於 1
+    """
+    if n < 1:
+        raise ValueError("n 必須為正整數")
+    if _TABLE is not None and int(_TABLE._index[-1]) + 1 >= n:
+        return _TABLE.nth_prime(n)
+    if n < 100_000:
+        return next(islice(primes_range(2, _nth_prime_upper_bound(n)), n - 1, None))
+
+    L = math.log(n)
+    LL = math.log(L)
+    x = int(n * (L + LL - 1 + (LL - 2) / L - (LL * LL - 6 * LL + 11) / (2 * L * L)))
+    count = prime_pi(x)
+    if count < n:
+        return next(islice(primes_range(x + 1, _nth_prime_upper_bound(n)), n - count - 1, None))
+
+    window = 2 * SEGMENT_SIZE
+    hi = x + 1
+    while True:
+        lo = max(hi - window, 2)
+        inside = _count_primes_range(lo, hi)
+        if count - inside < n:
+            return next(islice(primes_range(lo, hi), n - (count - inside) - 1, None))
+        count -= inside
+        hi = lo
+
+
+def benchmark_cutover(repeat: int = 2000) -> None:
+    """
+    測量不同大小的質數上，6k±1 試除法與確定性 Miller–Rabin 的平均時間，
+    用來調整 TRIAL_DIVISION_CUTOFF
+
+    Args:
+        repeat (int): 每個數字重複的次數
+    """
+    print(f"{'n':>16} {'試除法 (µs)':>14} {'Miller–Rabin (µs)':>20}")
+    for exponent in range(3, 10):
+        n = next(p for p in range(10 ** exponent + 1, 10 ** exponent + 1000, 2)
+                 if is_prime_trial(p))
+        timings = []
+        for func in (is_prime_trial, is_prime_mr):
+            start_time = time.perf_counter()
+            for _ in range(repeat):
+                func(n)
+            timings.append((time.perf_counter() - start_time) / repeat * 1e6)
+        print(f"{n:>16,} {timings[0]:>14.2f} {timings[1]:>20.2f}")
+
+
     
 if __name__ == '__main__':
     """
@@ -135,13 +1055,56 @@ if __name__ == '__main__':
         print(f"{num} 是質數嗎？(v2): {is_prime_v2(num)}")
         print(f"{num} 是質數嗎？(最優化): {is_prime(num)}")
     
+    # 測試分段篩法
+    print("\n分段篩法：")
+    start_time = time.time()
+    primes = generate_primes(1_000_000)
+    print(f"前 1,000,000 個質數，最後一個是 {primes[-1]:,} ({time.time() - start_time:.6f} 秒)")
+    print(f"10^12 之後的前 5 個質數: {list(islice(primes_range(10**12, 10**12 + 1000), 5))}")
+
     # 測試效能
     large_number = 1_000_000_007
     print(f"\n給定一個測試數字: {large_number:,}")
     print("效能測試開始...")
-    for func in [is_prime_v1, is_prime_v2, is_prime]:
+    for func in [is_prime_v1, is_prime_v2, is_prime_trial, is_prime]:
         start_time = time.time()
         result = func(large_number)
         end_time = time.time()
         print(f"{func.__name__}({large_number:,}): {result} ({end_time - start_time:.6f} 秒)")
+
+    # 測試大數：64 位元以內使用 Miller–Rabin，以上使用 BPSW
+    for n in [2**61 - 1, 2**64 - 59, 2**89 - 1, (2**61 - 1) * (2**89 - 1)]:
+        start_time = time.time()
+        result = is_prime(n)
+        end_time = time.time()
+        print(f"is_prime({n:,}): {result} ({end_time - start_time:.6f} 秒)")
+
+    # 測試批次檢測
+    print("\n批次檢測 (is_prime_many):")
+    print(f"0..29: {np.flatnonzero(is_prime_many(range(30))).tolist()}")
+    sparse = [10**12 + k for k in range(0, 100, 3)] + [2**64 - 59, 2**89 - 1]
+    print(f"稀疏的大數: {is_prime_many(sparse).sum()} 個質數")
+
+    # 測試磁碟質數表
+    print("\n磁碟質數表:")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        start_time = time.time()
+        with PrimeTable(f'{tmp_dir}/primes.bits', 10**7) as table:
+            print(f"建立 {table} ({time.time() - start_time:.6f} 秒)")
+        start_time = time.time()
+        with PrimeTable(f'{tmp_dir}/primes.bits', 10**8) as table:
+            print(f"擴充為 {table} ({time.time() - start_time:.6f} 秒)")
+            print(f"π(10^8) = {table.prime_pi(10**8):,}，第 1,000,000 個質數 = {table.nth_prime(10**6):,}")
+            print(f"is_prime(99,999,989) 查表: {table.is_prime(99_999_989)}")
+
+    # 測試質數計數與第 n 個質數
+    print("\n質數計數:")
+    for x in [10**9, 10**10, 10**11]:
+        start_time = time.time()
+        print(f"π({x:,}) = {prime_pi(x):,} ({time.time() - start_time:.6f} 秒)")
+    start_time = time.time()
+    print(f"第 1,000,000,000 個質數 = {nth_prime(10**9):,} ({time.time() - start_time:.6f} 秒)")
+
+    print("\n試除法與 Miller–Rabin 的交叉點:")
+    benchmark_cutover()
  
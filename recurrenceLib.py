@@ -0,0 +1,134 @@
+"""
+常係數線性遞迴函式庫
+
+    a(k) = c1 * a(k-1) + c2 * a(k-2) + ... + cd * a(k-d)
+
+以 d×d 的伴隨矩陣 M 表示一步遞迴：
+    (a(k+d-1), ..., a(k))ᵀ = M^k (a(d-1), ..., a(0))ᵀ
+第 n 項以 M 的快速冪計算，可指定模數 m。
+
+fibo（斐波那契數列）與 stairs（樓梯問題）共用這裡的矩陣運算：
+- linear_recurrence: 計算單一項
+- CompanionPowers: 保留 M^(2^j) 列表，計算同一個遞迴的多個項時矩陣平方只做一次
+- check_mod: 檢查模數參數
+"""
+
+from typing import List, Optional, Sequence
+
+
+def check_mod(mod: Optional[int]) -> None:
+    """
+    檢查模數：None 表示不取模，否則必須為正整數
+
+    Raises:
+        TypeError: 如果模數不是整數
+        ValueError: 如果模數不是正整數
+    """
+    if mod is None:
+        return
+    if type(mod) != int:
+        raise TypeError("模數必須為整數")
+    elif mod < 1:
+        raise ValueError("模數必須為正整數")
+
+
+def mat_mul(x: List[List[int]], y: List[List[int]], mod: Optional[int] = None) -> List[List[int]]:
+    """
+    方陣相乘，指定 mod 時每個元素取模
+    """
+    columns = list(zip(*y))
+    product = [[sum(a * b for a, b in zip(row, col)) for col in columns] for row in x]
+    if mod is not None:
+        product = [[value % mod for value in row] for row in product]
+    return product
+
+
+def mat_vec(x: List[List[int]], vector: Sequence[int], mod: Optional[int] = None) -> List[int]:
+    """
+    方陣乘以向量，指定 mod 時每個元素取模
+    """
+    product = [sum(a * b for a, b in zip(row, vector)) for row in x]
+    if mod is not None:
+        product = [value % mod for value in product]
+    return product
+
+
+class CompanionPowers:
+    """
+    一個線性遞迴的伴隨矩陣 M 與 M^(2^j) 列表，需要時才繼續平方，供多個 n 共用
+
+    以 M^(2^j) 依序乘上狀態向量 (a(d-1), ..., a(0))ᵀ，
+    每個 n 只需要 O(d² log n) 的向量乘法；平方 O(d³) 的部分只做一次
+
+    Args:
+        coefficients: 係數 (c1, c2, ..., cd)
+        initial: 前 d 項 (a(0), a(1), ..., a(d-1))
+        mod (int, optional): 指定時所有結果都取模
+
+    Raises:
+        ValueError: 如果係數與初始值的個數不同或為零，或 mod 不是正整數
+        TypeError: 如果 mod 不是整數
+    """
+
+    def __init__(self, coefficients: Sequence[int], initial: Sequence[int],
+                 mod: Optional[int] = None):
+        check_mod(mod)
+        d = len(coefficients)
+        if d == 0 or len(initial) != d:
+            raise ValueError("係數與初始值的個數必須相同且不為零")
+        self.mod = mod
+        self.size = d
+        # 伴隨矩陣：第一列為係數，其下為位移
+        self._powers = [[list(coefficients)] +
+                        [[int(i == j) for j in range(d)] for i in range(d - 1)]]
+        # 初始狀態 (a(d-1), ..., a(0))
+        self._initial = [value % mod if mod is not None else value
+                         for value in reversed(initial)]
+
+    def term(self, n: int) -> int:
+        """
+        回傳第 n 項 a(n)（n 從 0 開始）
+        """
+        if n < self.size:
+            return self._initial[self.size - 1 - n]
+        vector = self._initial
+        k, j = n - self.size + 1, 0
+        while k:
+            if j == len(self._powers):
+                self._powers.append(mat_mul(self._powers[-1], self._powers[-1], self.mod))
+            if k & 1:
+                vector = mat_vec(self._powers[j], vector, self.mod)
+            k >>= 1
+            j += 1
+        return vector[0]
+
+
+def linear_recurrence(n: int, coefficients: Sequence[int], initial: Sequence[int],
+                      mod: Optional[int] = None) -> int:
+    """
+    以矩陣快速冪計算常係數線性遞迴的第 n 項
+
+    a(k) = c1 * a(k-1) + c2 * a(k-2) + ... + cd * a(k-d)
+
+    Args:
+        n (int): 要計算的項（從 0 開始）
+        coefficients: 係數 (c1, c2, ..., cd)
+        initial: 前 d 項 (a(0), a(1), ..., a(d-1))
+        mod (int, optional): 指定時回傳 a(n) mod m，中間結果都取模
+
+    Returns:
+        int: 第 n 項
+
+    Raises:
+        TypeError: 如果 n 或 mod 不是整數
+        ValueError: 如果 n 為負數、mod 不是正整數，或係數與初始值的個數不同
+
+    說明:
+        二階遞迴（斐波那契、Lucas、Pell 等）即為 2×2 矩陣，
+        需要 O(d³ log n) 次乘法；同一個遞迴要計算多個項時改用 CompanionPowers
+    """
+    if type(n) != int:
+        raise TypeError("輸入必須為整數")
+    elif n < 0:
+        raise ValueError("輸入不能為負數")
+    return CompanionPowers(coefficients, initial, mod).term(n)
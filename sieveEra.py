@@ -9,14 +9,36 @@
 使用方法：
 1. primes_list(n) - 返回質數列表
 2. primes_set(n) - 返回質數集合
-3. primes_gen(n) - 生成器實作
-4. eratosthenes(n) - 埃拉托斯特尼篩法實作
+3. primes_gen(n) - 生成器實作；n 為 None 時不設上限
+4. from_(start) - 從 start 開始、不設上限的質數生成器
+5. take(n, start) - 返回從 start 開始的前 n 個質數
+6. eratosthenes(n) - 埃拉托斯特尼篩法實作
 
-注意：輸入必須為大於2的正整數
+primes_gen / from_ / take 是增量的分段篩法：逐一篩出範圍加倍的視窗
+[lo, 2·lo)，每個視窗交給 primeLib.primes_range 分段處理，
+只保存 √hi 以內的基底質數與一個分段，總成本接近線性
+primes_list 與 primes_set 只是包裝 primes_gen 的結果
+
+注意：有上限的函數，輸入必須為大於2的正整數
 """
 
 import time
-from primeLib import is_prime
+from itertools import islice
+from primeLib import SEGMENT_SIZE, is_prime, primes_range
+
+
+def _check_limit(num):
+    """
+    檢查有上限函數的輸入
+
+    Raises:
+        TypeError: 如果輸入不是整數
+        ValueError: 如果輸入小於3
+    """
+    if type(num) != int:
+        raise TypeError("輸入必須為整數")
+    if num < 3:
+        raise ValueError("輸入必須為大於2的整數")
 
 
 def primes_list(num):
@@ -33,20 +55,8 @@ def primes_list(num):
         TypeError: 如果輸入不是整數
         ValueError: 如果輸入小於3
     """
-    if type(num) != int:
-        raise TypeError("輸入必須為整數")
-    if num < 3:
-        raise ValueError("輸入必須為大於2的整數")
-    
-    L = [2]
-    if num == 3:
-        return L
-
-    for n in range(3, num + 1, 2):
-        if is_prime(n):
-            L.append(n)
-    
-    return L
+    _check_limit(num)
+    return list(primes_gen(num))
 
 
 def primes_set(num):
@@ -63,28 +73,16 @@ def primes_set(num):
         TypeError: 如果輸入不是整數
         ValueError: 如果輸入小於3
     """
-    if type(num) != int:
-        raise TypeError("輸入必須為整數")
-    if num < 3:
-        raise ValueError("輸入必須為大於2的整數")
-    
-    S = {2}
-    if num == 3:
-        return S
+    _check_limit(num)
+    return set(primes_gen(num))
 
-    for n in range(3, num + 1, 2):
-        if is_prime(n):
-            S.add(n)
-    
-    return S
 
-
-def primes_gen(num):
+def primes_gen(num=None):
     """
     使用生成器實現埃拉托斯特尼篩法
     
     Args:
-        num (int): 要生成質數的上限值
+        num (int, optional): 要生成質數的上限值（含），None 表示不設上限
         
     Yields:
         int: 生成的質數
@@ -93,15 +91,55 @@ def primes_gen(num):
         TypeError: 如果輸入不是整數
         ValueError: 如果輸入小於3
     """
-    if type(num) != int:
+    if num is None:
+        yield from from_(2)
+        return
+    _check_limit(num)
+    yield from primes_range(2, num + 1)
+
+
+def from_(start=2):
+    """
+    從 start 開始、不設上限的增量篩法生成器
+
+    依序篩 [lo, hi)、[hi, 2·hi)、... 等範圍加倍的視窗，
+    每個視窗由 primes_range 分段篩出並逐一產生
+
+    Args:
+        start (int): 起始值（含）
+
+    Yields:
+        int: 不小於 start 的質數，由小到大
+
+    Raises:
+        TypeError: 如果輸入不是整數
+    """
+    if type(start) != int:
         raise TypeError("輸入必須為整數")
-    if num < 3:
-        raise ValueError("輸入必須為大於2的整數")
-    
-    yield 2
-    for n in range(3, num + 1, 2):
-        if is_prime(n):
-            yield n
+    lo = max(start, 2)
+    hi = max(2 * lo, lo + 2 * SEGMENT_SIZE)
+    while True:
+        yield from primes_range(lo, hi)
+        lo, hi = hi, 2 * hi
+
+
+def take(n, start=2):
+    """
+    返回從 start 開始的前 n 個質數
+
+    Args:
+        n (int): 質數的個數
+        start (int): 起始值（含）
+
+    Returns:
+        list: 包含 n 個質數的列表
+
+    Raises:
+        TypeError: 如果輸入不是整數
+    """
+    if type(n) != int:
+        raise TypeError("輸入必須為整數")
+    return list(islice(from_(start), n))
 
 
 def eratosthenes(n):
@@ -162,6 +200,12 @@ def main():
     print(f'執行時間: {time.time() - start_time:.6f} 秒')
     print(f'埃拉托斯特尼篩法實作: {primes}')
 
+    print('\n呼叫 take(10) 與 take(5, 10**12)')
+    start_time = time.time()
+    print(f'前 10 個質數: {take(10)}')
+    print(f'10^12 之後的 5 個質數: {take(5, 10**12)}')
+    print(f'執行時間: {time.time() - start_time:.6f} 秒')
+
 
 if __name__ == '__main__':
     main()
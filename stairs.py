@@ -1,16 +1,158 @@
 """
 樓梯問題解決方案
 這個程式計算到達特定樓層的所有可能方式。
-使用者可以一次跨1階、2階或3階樓梯。
+使用者可以一次跨1階、2階或3階樓梯（steps_to），
+或指定任意的跨步集合（count_ways、count_ways_many）。
+
+到達第 n 階的方式數滿足線性遞迴
+    ways(n) = Σ ways(n - s)，s 屬於跨步集合，ways(0) = 1
+- n 較小時以長度為最大跨步的滾動視窗逐階累加
+- n 很大時以伴隨矩陣的快速冪計算（recurrenceLib.CompanionPowers，與 fibo 共用），
+  可指定模數 m
 """
 
-from functools import lru_cache
+import time
+from collections import deque
+from typing import Iterable, List, Optional
+from recurrenceLib import CompanionPowers, check_mod
+
+# 預設的跨步集合
+DEFAULT_STEPS = (1, 2, 3)
+
+# 滾動視窗需要約 n × |steps| 次加法，矩陣快速冪約 d³ × log2(n) 次乘法 (d = max(steps))；
+# n × |steps| 不超過後者的 ROLLING_FACTOR 倍時使用滾動視窗（實測的交叉點）
+ROLLING_FACTOR = 2
+
+
+def _normalize_steps(steps):
+    """
+    檢查跨步集合並回傳由小到大排列、不重複的元組
+    """
+    steps = tuple(sorted(set(steps)))
+    if not steps or any(type(s) != int or s < 1 for s in steps):
+        raise ValueError("跨步必須為正整數，且至少一個")
+    return steps
+
+
+def _check_stair(n):
+    """
+    檢查樓層號碼
+    """
+    if type(n) != int:
+        raise TypeError("樓層必須為整數")
+    elif n < 0:
+        raise ValueError("樓層不能為負數")
+
+
+def _use_rolling(n, steps):
+    """
+    判斷第 n 階該用滾動視窗（True）還是矩陣快速冪（False）
+    """
+    return n * len(steps) <= ROLLING_FACTOR * steps[-1] ** 3 * n.bit_length()
+
+
+def _rolling_ways(stop, steps, mod=None):
+    """
+    以滾動視窗產生 ways(0), ways(1), ..., ways(stop-1)
+
+    視窗只保留最近 max(steps) 階的方式數
+    """
+    width = steps[-1]
+    window = deque([0] * width, maxlen=width)   # window[-s] 為 ways(k - s)
+    for k in range(stop):
+        value = 1 if k == 0 else sum(window[-s] for s in steps)
+        if mod is not None:
+            value %= mod
+        window.append(value)
+        yield value
+
+
+def _companion_powers(steps, mod=None):
+    """
+    建立 ways 遞迴的 CompanionPowers：係數 c_s = 1（s 屬於跨步集合），
+    前 max(steps) 項由滾動視窗取得
+    """
+    width = steps[-1]
+    coefficients = [int(s in steps) for s in range(1, width + 1)]
+    return CompanionPowers(coefficients, list(_rolling_ways(width, steps, mod)), mod)
+
+
+def count_ways(n: int, steps: Iterable[int] = DEFAULT_STEPS, mod: Optional[int] = None) -> int:
+    """
+    計算每次可跨 steps 中任一階數時，到達第 n 階的所有可能方式
+
+    Args:
+        n (int): 目標樓層號碼（第 0 階為地面，只有一種方式）
+        steps: 每次可以跨的階數集合，預設為 (1, 2, 3)
+        mod (int, optional): 指定時回傳方式數 mod m
+
+    Returns:
+        int: 到達該樓層的所有可能方式數量
+
+    Raises:
+        TypeError: 如果樓層或 mod 不是整數
+        ValueError: 如果樓層為負數、mod 不是正整數，或跨步集合不正確
+
+    說明:
+        - n 較小時（見 ROLLING_FACTOR）以滾動視窗逐階累加，時間 O(n × |steps|)
+        - n 更大時以 max(steps) × max(steps) 的伴隨矩陣快速冪計算，
+          需要 O(log n) 次矩陣乘法；指定 mod 時數字不會變大
+    """
+    _check_stair(n)
+    check_mod(mod)
+    steps = _normalize_steps(steps)
+    if _use_rolling(n, steps):
+        for value in _rolling_ways(n + 1, steps, mod):
+            pass
+        return value
+    return _companion_powers(steps, mod).term(n)
+
+
+def count_ways_many(values: Iterable[int], steps: Iterable[int] = DEFAULT_STEPS,
+                    mod: Optional[int] = None) -> List[int]:
+    """
+    批次計算多個樓層的方式數，共用中間結果
+
+    Args:
+        values: 目標樓層號碼的可迭代物件
+        steps: 每次可以跨的階數集合，預設為 (1, 2, 3)
+        mod (int, optional): 指定時回傳方式數 mod m
+
+    Returns:
+        list: 與輸入順序相同的方式數
+
+    Raises:
+        TypeError: 如果樓層或 mod 不是整數
+        ValueError: 如果樓層為負數、mod 不是正整數，或跨步集合不正確
+
+    說明:
+        - 適合滾動視窗的樓層由同一次掃描取得
+        - 更大的樓層共用同一組 M^(2^j)，矩陣平方只做一次
+    """
+    values = list(values)
+    for n in values:
+        _check_stair(n)
+    check_mod(mod)
+    steps = _normalize_steps(steps)
+
+    results = {}
+    small = sorted({n for n in values if _use_rolling(n, steps)})
+    if small:
+        wanted = set(small)
+        for k, value in enumerate(_rolling_ways(small[-1] + 1, steps, mod)):
+            if k in wanted:
+                results[k] = value
+    large = {n for n in values if n not in results}
+    if large:
+        powers = _companion_powers(steps, mod)
+        for n in large:
+            results[n] = powers.term(n)
+    return [results[n] for n in values]
 
 
-@lru_cache(maxsize=100)
 def steps_to(stair):
     """
-    計算到達指定樓層的所有可能方式
+    計算每次跨1階、2階或3階時，到達指定樓層的所有可能方式
 
     Args:
         stair (int): 目標樓層號碼
@@ -18,42 +160,36 @@ def steps_to(stair):
     Returns:
         int: 到達該樓層的所有可能方式數量
     """
-    if stair == 1:
-        # 一階樓梯只有一種方式：從地面跨一階
-        return 1
-    elif stair == 2:
-        # 二階樓梯有兩種方式：
-        # 1. 從地面直接跨兩階
-        # 2. 分兩次跨一階
-        return 2
-    elif stair == 3:
-        # 三階樓梯有四種方式：
-        # 1. 從地面直接跨三階
-        # 2. 先跨兩階再跨一階
-        # 3. 先跨一階再跨兩階
-        # 4. 分三次跨一階
-        return 4
-    else:
-        # 一般情況：當前樓層可以從三個位置跨到：
-        # 1. 從三階樓下
-        # 2. 從兩階樓下
-        # 3. 從一階樓下
-        # 將這三個位置的可能方式加總即為解
-        return (
-            steps_to(stair - 3)
-            + steps_to(stair - 2)
-            + steps_to(stair - 1)
-        )
+    return count_ways(stair, DEFAULT_STEPS)
 
 
 def main():
     """
     主程式函數
-    計算並顯示從第4階到第99階的所有可能方式
+    計算並顯示從第4階到第99階的所有可能方式，
+    再示範任意跨步、取模與批次計算
     """
     for n in range(4, 100):
         print(f'到達第{n}階有 {steps_to(n)} 種方式')
 
+    print(f'\n跨步 {{1, 3, 5}} 到達第 50 階有 {count_ways(50, {1, 3, 5})} 種方式')
+    for n in (10_000, 100_000, 10**18):
+        start_time = time.time()
+        ways = count_ways(n, mod=1_000_000_007)
+        print(f'到達第{n:,}階的方式數 mod 1,000,000,007 = {ways} '
+              f'({time.time() - start_time:.6f} 秒)')
+
+    values = list(range(0, 100_000, 997)) + [10**k for k in range(6, 19)]
+    start_time = time.time()
+    batch = count_ways_many(values, mod=1_000_000_007)
+    batch_time = time.time() - start_time
+    start_time = time.time()
+    single = [count_ways(n, mod=1_000_000_007) for n in values]
+    single_time = time.time() - start_time
+    assert batch == single
+    print(f'\n批次計算 {len(values)} 個樓層: {batch_time:.6f} 秒，'
+          f'逐一計算: {single_time:.6f} 秒')
+
 
 if __name__ == '__main__':
     main()